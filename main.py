@@ -1,11 +1,9 @@
-from pathlib import Path
-import sys
-
 from dotenv import load_dotenv
 
-sys.path.append(str(Path(__file__).resolve().parent / "src"))
+from umamusume_web_crawler.config import dotenv_disabled
 
-load_dotenv()
+if not dotenv_disabled():
+    load_dotenv()
 
 from umamusume_web_crawler.cli import main
 
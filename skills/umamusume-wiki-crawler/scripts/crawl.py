@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import functools
 import json
 import sys
 from pathlib import Path
-from urllib.parse import parse_qs, quote, unquote, urlparse
 
 from dotenv import load_dotenv
 
@@ -21,11 +21,15 @@ src_path = project_root / "src"
 if src_path.exists():
     sys.path.insert(0, str(src_path))
 
-from umamusume_web_crawler.config import config
+from umamusume_web_crawler.config import config, dotenv_disabled
+from umamusume_web_crawler.runner import run_async
+from umamusume_web_crawler.url_utils import build_wiki_url, title_from_url
 from umamusume_web_crawler.web.biligame import (
     fetch_biligame_wikitext_expanded,
     search_biligame_titles,
 )
+from umamusume_web_crawler.web.browser_pool import close_browser_pool
+from umamusume_web_crawler.web.http_client import close_session
 from umamusume_web_crawler.web.moegirl import (
     fetch_moegirl_wikitext_expanded,
     search_moegirl_titles,
@@ -38,31 +42,12 @@ from umamusume_web_crawler.web.umamusu_wiki import (
     list_umamusu_category_files,
     search_umamusu_titles,
 )
-from umamusume_web_crawler.web.parse_wiki_infobox import (
-    parse_wiki_page,
-    wiki_page_to_llm_markdown,
-)
+from umamusume_web_crawler.web.parse_wiki_infobox import wikitext_to_llm_markdown
 
 _BILIGAME_BASE_URL = "https://wiki.biligame.com/umamusume/"
 _MOEGIRL_BASE_URL = "https://mzh.moegirl.org.cn/"
 
 
-def _title_from_url(value: str) -> str:
-    if not value.startswith("http://") and not value.startswith("https://"):
-        return value
-    parsed = urlparse(value)
-    if parsed.path.endswith("/index.php"):
-        params = parse_qs(parsed.query)
-        title = params.get("title", [""])[0]
-        if title:
-            return title
-    return unquote(parsed.path.strip("/").split("/")[-1])
-
-
-def _build_wiki_url(base_url: str, title: str) -> str:
-    return f"{base_url}{quote(title)}"
-
-
 def _resolve_proxy_arg(namespace: argparse.Namespace) -> bool | None:
     if namespace.proxy:
         return True
@@ -111,7 +96,7 @@ async def tool_biligame_wiki_search(
         results = [
             {
                 "title": title,
-                "url": _build_wiki_url(_BILIGAME_BASE_URL, title),
+                "url": build_wiki_url(_BILIGAME_BASE_URL, title),
                 "priority": str(idx + 1),
             }
             for idx, title in enumerate(titles)
@@ -132,7 +117,7 @@ async def tool_moegirl_wiki_search(
         results = [
             {
                 "title": title,
-                "url": _build_wiki_url(_MOEGIRL_BASE_URL, title),
+                "url": build_wiki_url(_MOEGIRL_BASE_URL, title),
                 "priority": str(idx + 1),
             }
             for idx, title in enumerate(titles)
@@ -156,9 +141,9 @@ async def tool_crawl_biligame_wiki(
             max_pages=max_pages,
             use_proxy=use_proxy,
         )
-        page = parse_wiki_page(wikitext, site="biligame")
-        heading = _title_from_url(url)
-        markdown = wiki_page_to_llm_markdown(heading, page, site="biligame")
+        markdown = wikitext_to_llm_markdown(
+            title_from_url(url), wikitext, site="biligame"
+        )
         return {"status": "success", "result": markdown}
     except Exception as exc:
         return {"status": "error", "message": str(exc)}
@@ -178,9 +163,9 @@ async def tool_crawl_moegirl_wiki(
             max_pages=max_pages,
             use_proxy=use_proxy,
         )
-        page = parse_wiki_page(wikitext, site="moegirl")
-        heading = _title_from_url(url)
-        markdown = wiki_page_to_llm_markdown(heading, page, site="moegirl")
+        markdown = wikitext_to_llm_markdown(
+            title_from_url(url), wikitext, site="moegirl"
+        )
         return {"status": "success", "result": markdown}
     except Exception as exc:
         return {"status": "error", "message": str(exc)}
@@ -197,7 +182,7 @@ async def tool_umamusu_wiki_search(
         results = [
             {
                 "title": title,
-                "url": _build_wiki_url(_UMAMUSU_BASE_URL, title),
+                "url": build_wiki_url(_UMAMUSU_BASE_URL, title),
                 "priority": str(idx + 1),
             }
             for idx, title in enumerate(titles)
@@ -221,9 +206,9 @@ async def tool_crawl_umamusu_wiki(
             max_pages=max_pages,
             use_proxy=use_proxy,
         )
-        page = parse_wiki_page(wikitext, site="umamusu")
-        heading = _title_from_url(url)
-        markdown = wiki_page_to_llm_markdown(heading, page, site="umamusu")
+        markdown = wikitext_to_llm_markdown(
+            title_from_url(url), wikitext, site="umamusu"
+        )
         return {"status": "success", "result": markdown}
     except Exception as exc:
         return {"status": "error", "message": str(exc)}
@@ -304,7 +289,8 @@ def _add_proxy_flags(parser: argparse.ArgumentParser) -> None:
     group.add_argument("--no-proxy", action="store_true", help="Disable proxy")
 
 
-def parse_args() -> argparse.Namespace:
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description=(
             "CLI wrapper for Umamusume wiki tools across "
@@ -395,7 +381,11 @@ def parse_args() -> argparse.Namespace:
     )
     _add_proxy_flags(p_umamusu_download)
 
-    return parser.parse_args()
+    return parser
+
+
+def parse_args() -> argparse.Namespace:
+    return _build_parser().parse_args()
 
 
 def _has_error(payload: dict) -> bool:
@@ -459,11 +449,20 @@ async def _run(args: argparse.Namespace) -> int:
     return 1 if _has_error(payload) else 0
 
 
+async def _main_async(args: argparse.Namespace) -> int:
+    try:
+        return await _run(args)
+    finally:
+        await close_session()
+        await close_browser_pool()
+
+
 def main() -> None:
-    load_dotenv()
+    if not dotenv_disabled():
+        load_dotenv()
     config.update_from_env()
     args = parse_args()
-    code = asyncio.run(_run(args))
+    code = run_async(_main_async(args))
     raise SystemExit(code)
 
 
@@ -1 +1,5 @@
 """Project package for Umamusume web crawling utilities."""
+
+import logging
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
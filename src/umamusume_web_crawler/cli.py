@@ -2,70 +2,54 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import functools
 import json
+import logging
 from pathlib import Path
-from urllib.parse import urlparse
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
 
-from umamusume_web_crawler.config import config
-
-from umamusume_web_crawler.web.crawler import (
-    crawl_biligame_page,
-    crawl_biligame_page_visual_markitdown,
-    crawl_moegirl_page,
-    crawl_moegirl_page_visual_markitdown,
-    crawl_page,
-    crawl_page_visual_markitdown,
-)
-from umamusume_web_crawler.web.biligame import fetch_biligame_wikitext_expanded
-from umamusume_web_crawler.web.biligame_assets import (
-    CharacterAssetTarget,
+from umamusume_web_crawler.config import (
     DEFAULT_AUDIO_OUTPUT_ROOT,
     DEFAULT_CHARACTERS_JSON,
     DEFAULT_IMAGE_OUTPUT_ROOT,
-    crawl_biligame_character_assets,
-    load_asset_targets_from_json,
+    config,
+    dotenv_disabled,
+)
+from umamusume_web_crawler.runner import run_async
+from umamusume_web_crawler.url_utils import detect_mode, title_from_url
+from umamusume_web_crawler.web.biligame import fetch_biligame_wikitext_expanded
+from umamusume_web_crawler.web.cache import (
+    load_cached_markdown,
+    markdown_cache_key,
+    store_cached_markdown,
 )
 from umamusume_web_crawler.web.character_index import (
     DEFAULT_NAME_OVERRIDES,
     update_character_index,
 )
+from umamusume_web_crawler.web.browser_pool import close_browser_pool
+from umamusume_web_crawler.web.http_client import close_session
 from umamusume_web_crawler.web.moegirl import fetch_moegirl_wikitext_expanded
 from umamusume_web_crawler.web.umamusu_wiki import fetch_umamusu_wikitext_expanded
-from umamusume_web_crawler.web.parse_wiki_infobox import (
-    parse_wiki_page,
-    wiki_page_to_llm_markdown,
-)
+from umamusume_web_crawler.web.parse_wiki_infobox import wikitext_to_llm_markdown
 
+if TYPE_CHECKING:
+    from umamusume_web_crawler.web.biligame_assets import CharacterAssetTarget
 
-def _detect_mode(url: str) -> str:
-    host = urlparse(url).netloc.lower()
-    if "wiki.biligame.com" in host:
-        return "biligame"
-    if "moegirl.org.cn" in host:
-        return "moegirl"
-    if "umamusu.wiki" in host:
-        return "umamusu"
-    return "generic"
+logger = logging.getLogger(__name__)
 
-
-def _title_from_url(value: str) -> str:
-    if not value.startswith("http://") and not value.startswith("https://"):
-        return value
-    parsed = urlparse(value)
-    if parsed.path.endswith("/index.php"):
-        params = urlparse(value).query
-        # simple parse
-        if "title=" in params:
-            import urllib.parse
-            q = urllib.parse.parse_qs(params)
-            return q.get("title", [""])[0] or "page"
-    return Path(parsed.path).name or "page"
+_OUTPUT_CHUNK_CHARS = 64 * 1024
 
 
 async def _run_api_crawl(url: str, site: str, use_proxy: bool | None) -> str:
-    print(f"[API-CRAWL] Fetching {url} via MediaWiki API...")
+    cache_key = markdown_cache_key(url, site, max_depth=1, max_pages=5)
+    cached = await asyncio.to_thread(load_cached_markdown, cache_key)
+    if cached is not None:
+        logger.info("[API-CRAWL] Using cached result for %s", url)
+        return cached
+    logger.info("[API-CRAWL] Fetching %s via MediaWiki API...", url)
     if site == "biligame":
         wikitext = await fetch_biligame_wikitext_expanded(
             url, max_depth=1, max_pages=5, use_proxy=use_proxy
@@ -81,9 +65,17 @@ async def _run_api_crawl(url: str, site: str, use_proxy: bool | None) -> str:
     else:
         raise ValueError(f"Unsupported API site: {site}")
 
-    page = parse_wiki_page(wikitext, site=site)
-    heading = _title_from_url(url)
-    return wiki_page_to_llm_markdown(heading, page, site=site)
+    heading = title_from_url(url) or "page"
+    markdown = wikitext_to_llm_markdown(heading, wikitext, site=site)
+    await asyncio.to_thread(store_cached_markdown, cache_key, markdown)
+    return markdown
+
+
+def _write_text_chunked(path: Path, content: str) -> None:
+    # 分块编码写入，避免 write_text 为整页内容再生成一份完整的 bytes 副本
+    with path.open("w", encoding="utf-8") as handle:
+        for start in range(0, len(content), _OUTPUT_CHUNK_CHARS):
+            handle.write(content[start : start + _OUTPUT_CHUNK_CHARS])
 
 
 def _proxy_flag(value: bool | None, *, default: bool) -> bool:
@@ -97,13 +89,16 @@ def _resolve_asset_targets(
         if not args.name or len(args.character) != len(args.name):
             raise SystemExit("--character and --name must be provided with the same count.")
         return dict(zip(args.character, args.name, strict=True))
+    from umamusume_web_crawler.web.biligame_assets import load_asset_targets_from_json
+
     return load_asset_targets_from_json(
         args.characters_json,
         include_variants=getattr(args, "include_variants", False),
     )
 
 
-def parse_args() -> argparse.Namespace:
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Umamusume crawler CLI")
     parser.add_argument(
         "--task",
@@ -112,6 +107,12 @@ def parse_args() -> argparse.Namespace:
         help="Task to run (default: page)",
     )
     parser.add_argument("--url", help="Target URL to crawl")
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Log crawl progress (INFO) to stderr.",
+    )
     parser.add_argument(
         "--mode",
         choices=("auto", "biligame", "moegirl", "umamusu", "generic"),
@@ -295,7 +296,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Reduce biligame asset crawl logging.",
     )
-    return parser.parse_args()
+    return parser
+
+
+def parse_args() -> argparse.Namespace:
+    return _build_parser().parse_args()
 
 
 async def _run(args: argparse.Namespace) -> None:
@@ -328,6 +333,10 @@ async def _run(args: argparse.Namespace) -> None:
                 "--include-variants uses the schema-v2 --characters-json; "
                 "do not combine it with --character."
             )
+        from umamusume_web_crawler.web.biligame_assets import (
+            crawl_biligame_character_assets,
+        )
+
         targets = _resolve_asset_targets(args)
         summary = await crawl_biligame_character_assets(
             targets,
@@ -365,7 +374,7 @@ async def _run(args: argparse.Namespace) -> None:
     if not args.url:
         raise SystemExit("--url is required when --task page.")
 
-    mode = _detect_mode(args.url) if args.mode == "auto" else args.mode
+    mode = detect_mode(args.url) if args.mode == "auto" else args.mode
     capture_pdf = True
     if args.no_capture_pdf:
         capture_pdf = False
@@ -373,6 +382,13 @@ async def _run(args: argparse.Namespace) -> None:
         capture_pdf = True
 
     if args.visual:
+        # crawl4ai/Playwright 只在浏览器抓取路径上才需要，避免拖慢 API 模式启动
+        from umamusume_web_crawler.web.crawler import (
+            crawl_biligame_page_visual_markitdown,
+            crawl_moegirl_page_visual_markitdown,
+            crawl_page_visual_markitdown,
+        )
+
         output_dir = Path(args.visual_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         if mode == "biligame":
@@ -408,6 +424,8 @@ async def _run(args: argparse.Namespace) -> None:
              content = await _run_api_crawl(args.url, "umamusu", use_proxy)
         else:
              # Fallback to headless browser for generic pages
+             from umamusume_web_crawler.web.crawler import crawl_page
+
              content = await crawl_page(
                 args.url, use_proxy=_proxy_flag(use_proxy, default=False)
             )
@@ -418,13 +436,24 @@ async def _run(args: argparse.Namespace) -> None:
 
     output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(content, encoding="utf-8")
+    _write_text_chunked(output_path, content)
     print(f"Wrote {len(content)} chars to {output_path}")
 
 
+async def _main_async(args: argparse.Namespace) -> None:
+    try:
+        await _run(args)
+    finally:
+        await close_session()
+        await close_browser_pool()
+
+
 def main() -> None:
-    load_dotenv()
+    if not dotenv_disabled():
+        load_dotenv()
     args = parse_args()
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     overrides = {}
     if args.google_api_key:
@@ -435,7 +464,7 @@ def main() -> None:
     if overrides:
         config.apply_overrides(**overrides)
 
-    asyncio.run(_run(args))
+    run_async(_main_async(args))
 
 
 if __name__ == "__main__":
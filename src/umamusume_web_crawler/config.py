@@ -1,12 +1,49 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass, fields
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 
 PACKAGE_DIR = Path(__file__).resolve().parent
 ROOT_DIR = PACKAGE_DIR.parents[1]
 
+DEFAULT_AUDIO_OUTPUT_ROOT = "results/voicedata"
+DEFAULT_IMAGE_OUTPUT_ROOT = "results/imagedata/characters"
+DEFAULT_CHARACTERS_JSON = "umamusume_characters.json"
+
+# (字段名, 环境变量, 解析函数)；变量缺失或为空串时使用字段默认值
+_ENV_SPEC: tuple[tuple[str, str, Callable[[str], object]], ...] = (
+    ("user_agent", "USER_AGENT", str),
+    ("http_proxy", "HTTP_PROXY", str),
+    ("https_proxy", "HTTPS_PROXY", str),
+    ("google_api_key", "GOOGLE_API_KEY", str),
+    ("google_cse_id", "GOOGLE_CSE_ID", str),
+    ("crawler_pruned_threshold", "CRAWLER_PRUNED_THRESHOLD", float),
+    ("crawler_pruned_min_words", "CRAWLER_PRUNED_MIN_WORDS", int),
+    ("crawler_timeout_s", "CRAWLER_TIMEOUT_S", float),
+    ("crawler_user_data_dir", "CRAWLER_USER_DATA_DIR", str),
+    ("crawler_concurrency", "CRAWLER_CONCURRENCY", int),
+    ("crawler_host_concurrency", "CRAWLER_HOST_CONCURRENCY", int),
+    ("crawler_browser_concurrency", "CRAWLER_BROWSER_CONCURRENCY", int),
+    ("crawler_visual_concurrency", "CRAWLER_VISUAL_CONCURRENCY", int),
+    ("crawler_cache_dir", "CRAWLER_CACHE_DIR", str),
+    ("crawler_cache_ttl_s", "CRAWLER_CACHE_TTL_S", float),
+)
+
+
+def _parse_env(
+    raw: str | None, parser: Callable[[str], object], default: object
+) -> object:
+    if raw in (None, ""):
+        return default
+    return parser(raw)
+
+
+def dotenv_disabled() -> bool:
+    # 进程反复启动且环境变量已由部署注入时，可跳过 .env 文件扫描
+    return os.getenv("UMAMUSUME_SKIP_DOTENV") == "1"
+
 
 @dataclass
 class Config:
@@ -24,47 +61,33 @@ class Config:
     crawler_pruned_min_words: int = 5
     crawler_timeout_s: float = 300.0
     crawler_user_data_dir: str | None = None
+    crawler_concurrency: int = 8
+    crawler_host_concurrency: int = 4
+    crawler_browser_concurrency: int = 8
+    crawler_visual_concurrency: int = 2
+    crawler_cache_dir: str | None = None
+    crawler_cache_ttl_s: float = 3600.0
+
+    _env_loaded: bool = field(default=False, init=False, repr=False, compare=False)
 
     @classmethod
     def from_env(cls, environ: dict[str, str] | None = None) -> "Config":
         env = environ or os.environ
-        threshold_raw = env.get("CRAWLER_PRUNED_THRESHOLD")
-        min_words_raw = env.get("CRAWLER_PRUNED_MIN_WORDS")
-        timeout_raw = env.get("CRAWLER_TIMEOUT_S")
-        threshold = (
-            cls.crawler_pruned_threshold
-            if threshold_raw in (None, "")
-            else float(threshold_raw)
-        )
-        min_words = (
-            cls.crawler_pruned_min_words
-            if min_words_raw in (None, "")
-            else int(min_words_raw)
-        )
-        timeout = (
-            cls.crawler_timeout_s
-            if timeout_raw in (None, "")
-            else float(timeout_raw)
-        )
-        user_data_dir = env.get("CRAWLER_USER_DATA_DIR")
-        if user_data_dir == "":
-            user_data_dir = None
         return cls(
-            user_agent=env.get("USER_AGENT", cls.user_agent),
-            http_proxy=env.get("HTTP_PROXY"),
-            https_proxy=env.get("HTTPS_PROXY"),
-            google_api_key=env.get("GOOGLE_API_KEY", ""),
-            google_cse_id=env.get("GOOGLE_CSE_ID", ""),
-            crawler_pruned_threshold=threshold,
-            crawler_pruned_min_words=min_words,
-            crawler_timeout_s=timeout,
-            crawler_user_data_dir=user_data_dir,
+            **{
+                name: _parse_env(env.get(var), parser, getattr(cls, name))
+                for name, var, parser in _ENV_SPEC
+            }
         )
 
-    def update_from_env(self, environ: dict[str, str] | None = None) -> None:
-        updated = self.from_env(environ=environ)
-        for field in fields(self):
-            setattr(self, field.name, getattr(updated, field.name))
+    def update_from_env(
+        self, environ: dict[str, str] | None = None, *, once: bool = False
+    ) -> None:
+        # 默认总是重新读取；反复进入的入口可传 once=True，进程环境已读过时跳过
+        if once and environ is None and self._env_loaded:
+            return
+        self.__dict__.update(self.from_env(environ=environ).__dict__)
+        self._env_loaded = True
 
     def apply_overrides(self, **overrides: object) -> None:
         for key, value in overrides.items():
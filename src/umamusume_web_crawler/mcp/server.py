@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import contextlib
+import copy
+import functools
+import logging
+import os
 import sys
-from urllib.parse import parse_qs, quote, unquote, urlparse
 from collections.abc import AsyncIterator
 
 from dotenv import load_dotenv
@@ -18,10 +22,25 @@ from starlette.requests import Request
 from starlette.routing import Mount, Route
 from starlette.types import Receive, Scope, Send
 
+from umamusume_web_crawler.config import dotenv_disabled
+from umamusume_web_crawler.runner import install_uvloop
+from umamusume_web_crawler.url_utils import build_wiki_url, title_from_url
 from umamusume_web_crawler.web.biligame import (
     fetch_biligame_wikitext_expanded,
     search_biligame_titles,
 )
+from umamusume_web_crawler.web.browser_pool import close_browser_pool
+from umamusume_web_crawler.web.cache import (
+    close_cache,
+    load_cached_markdown,
+    markdown_cache_key,
+    store_cached_markdown,
+)
+from umamusume_web_crawler.web.http_client import (
+    close_session,
+    get_session,
+    prewarm,
+)
 from umamusume_web_crawler.web.moegirl import (
     fetch_moegirl_wikitext_expanded,
     search_moegirl_titles,
@@ -32,35 +51,19 @@ from umamusume_web_crawler.web.umamusu_wiki import (
     fetch_umamusu_wikitext_expanded,
     search_umamusu_titles,
 )
-from umamusume_web_crawler.web.parse_wiki_infobox import (
-    parse_wiki_page,
-    wiki_page_to_llm_markdown,
-)
+from umamusume_web_crawler.web.parse_wiki_infobox import wikitext_to_llm_markdown
 from umamusume_web_crawler.web.search import (
-    google_search_page_urls,
-    google_search_urls,
+    google_search_page_urls_async,
+    google_search_urls_async,
 )
 
+logger = logging.getLogger(__name__)
+
 mcp = FastMCP("Umamusume Web MCP")
 
 _BILIGAME_BASE_URL = "https://wiki.biligame.com/umamusume/"
 _MOEGIRL_BASE_URL = "https://mzh.moegirl.org.cn/"
-
-
-def _title_from_url(value: str) -> str:
-    if not value.startswith("http://") and not value.startswith("https://"):
-        return value
-    parsed = urlparse(value)
-    if parsed.path.endswith("/index.php"):
-        params = parse_qs(parsed.query)
-        title = params.get("title", [""])[0]
-        if title:
-            return title
-    return unquote(parsed.path.strip("/").split("/")[-1])
-
-
-def _build_wiki_url(base_url: str, title: str) -> str:
-    return f"{base_url}{quote(title)}"
+_API_HOSTS = ["wiki.biligame.com", "mzh.moegirl.org.cn", "umamusu.wiki"]
 
 
 @mcp.tool(
@@ -76,7 +79,7 @@ Example queries:
 )
 async def web_search_google(query: str) -> dict:
     try:
-        results = google_search_urls(query, num=5)
+        results = await google_search_urls_async(query, num=5)
         return {
             "results": [
                 {"url": item["url"], "priority": str(item["priority"])}
@@ -102,7 +105,7 @@ async def biligame_wiki_seaech(
         results = [
             {
                 "title": title,
-                "url": _build_wiki_url(_BILIGAME_BASE_URL, title),
+                "url": build_wiki_url(_BILIGAME_BASE_URL, title),
                 "priority": str(idx + 1),
             }
             for idx, title in enumerate(titles)
@@ -127,7 +130,7 @@ async def moegirl_wiki_search(
         results = [
             {
                 "title": title,
-                "url": _build_wiki_url(_MOEGIRL_BASE_URL, title),
+                "url": build_wiki_url(_MOEGIRL_BASE_URL, title),
                 "priority": str(idx + 1),
             }
             for idx, title in enumerate(titles)
@@ -150,7 +153,7 @@ async def umamusu_wiki_search(
         results = [
             {
                 "title": title,
-                "url": _build_wiki_url(_UMAMUSU_BASE_URL, title),
+                "url": build_wiki_url(_UMAMUSU_BASE_URL, title),
                 "priority": str(idx + 1),
             }
             for idx, title in enumerate(titles)
@@ -171,17 +174,26 @@ async def crawl_biligame_wiki(
     max_depth: int = 1,
     max_pages: int = 5,
     use_proxy: bool | None = None,
+    concurrency: int | None = None,
 ) -> dict:
     try:
+        cache_key = markdown_cache_key(
+            url, "biligame", max_depth=max_depth, max_pages=max_pages
+        )
+        cached = await asyncio.to_thread(load_cached_markdown, cache_key)
+        if cached is not None:
+            return {"status": "success", "result": cached}
         wikitext = await fetch_biligame_wikitext_expanded(
             url,
             max_depth=max_depth,
             max_pages=max_pages,
             use_proxy=use_proxy,
+            concurrency=concurrency,
         )
-        page = parse_wiki_page(wikitext, site="biligame")
-        heading = _title_from_url(url)
-        markdown = wiki_page_to_llm_markdown(heading, page, site="biligame")
+        markdown = await asyncio.to_thread(
+            wikitext_to_llm_markdown, title_from_url(url), wikitext, site="biligame"
+        )
+        await asyncio.to_thread(store_cached_markdown, cache_key, markdown)
         return {"status": "success", "result": markdown}
     except Exception as exc:
         return {"status": "error", "message": str(exc)}
@@ -198,17 +210,26 @@ async def crawl_moegirl_wiki(
     max_depth: int = 1,
     max_pages: int = 5,
     use_proxy: bool | None = None,
+    concurrency: int | None = None,
 ) -> dict:
     try:
+        cache_key = markdown_cache_key(
+            url, "moegirl", max_depth=max_depth, max_pages=max_pages
+        )
+        cached = await asyncio.to_thread(load_cached_markdown, cache_key)
+        if cached is not None:
+            return {"status": "success", "result": cached}
         wikitext = await fetch_moegirl_wikitext_expanded(
             url,
             max_depth=max_depth,
             max_pages=max_pages,
             use_proxy=use_proxy,
+            concurrency=concurrency,
         )
-        page = parse_wiki_page(wikitext, site="moegirl")
-        heading = _title_from_url(url)
-        markdown = wiki_page_to_llm_markdown(heading, page, site="moegirl")
+        markdown = await asyncio.to_thread(
+            wikitext_to_llm_markdown, title_from_url(url), wikitext, site="moegirl"
+        )
+        await asyncio.to_thread(store_cached_markdown, cache_key, markdown)
         return {"status": "success", "result": markdown}
     except Exception as exc:
         return {"status": "error", "message": str(exc)}
@@ -225,17 +246,26 @@ async def crawl_umamusu_wiki(
     max_depth: int = 1,
     max_pages: int = 5,
     use_proxy: bool | None = None,
+    concurrency: int | None = None,
 ) -> dict:
     try:
+        cache_key = markdown_cache_key(
+            url, "umamusu", max_depth=max_depth, max_pages=max_pages
+        )
+        cached = await asyncio.to_thread(load_cached_markdown, cache_key)
+        if cached is not None:
+            return {"status": "success", "result": cached}
         wikitext = await fetch_umamusu_wikitext_expanded(
             url,
             max_depth=max_depth,
             max_pages=max_pages,
             use_proxy=use_proxy,
+            concurrency=concurrency,
+        )
+        markdown = await asyncio.to_thread(
+            wikitext_to_llm_markdown, title_from_url(url), wikitext, site="umamusu"
         )
-        page = parse_wiki_page(wikitext, site="umamusu")
-        heading = _title_from_url(url)
-        markdown = wiki_page_to_llm_markdown(heading, page, site="umamusu")
+        await asyncio.to_thread(store_cached_markdown, cache_key, markdown)
         return {"status": "success", "result": markdown}
     except Exception as exc:
         return {"status": "error", "message": str(exc)}
@@ -283,7 +313,9 @@ async def crawl_google_page(
     query: str, num: int = 5, use_proxy: bool | None = None
 ) -> dict:
     try:
-        results = google_search_page_urls(query, num=num, use_proxy=use_proxy)
+        results = await google_search_page_urls_async(
+            query, num=num, use_proxy=use_proxy
+        )
         return {
             "results": [
                 {"url": item["url"], "priority": str(item["priority"])}
@@ -295,6 +327,7 @@ async def crawl_google_page(
 
 
 def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlette:
+    # session manager 的 run() 每个实例只能调用一次，每个 app 各建一份
     sse = SseServerTransport("/messages/")
     session_manager = StreamableHTTPSessionManager(
         app=mcp_server,
@@ -302,18 +335,17 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
         json_response=True,
         stateless=True,
     )
+    connect_sse = sse.connect_sse
+    run_server = mcp_server.run
+    init_options = mcp_server.create_initialization_options()
 
     async def handle_sse(request: Request) -> None:
-        async with sse.connect_sse(
+        async with connect_sse(
             request.scope,
             request.receive,
             request._send,
         ) as (read_stream, write_stream):
-            await mcp_server.run(
-                read_stream,
-                write_stream,
-                mcp_server.create_initialization_options(),
-            )
+            await run_server(read_stream, write_stream, init_options)
 
     async def handle_streamable_http(
         scope: Scope, receive: Receive, send: Send
@@ -323,11 +355,16 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
     @contextlib.asynccontextmanager
     async def lifespan(app: Starlette) -> AsyncIterator[None]:
         async with session_manager.run():
-            print("MCP Web server started (StreamableHTTP).")
+            get_session()
+            await prewarm(_API_HOSTS)
+            logger.info("MCP Web server started (StreamableHTTP).")
             try:
                 yield
             finally:
-                print("MCP Web server shutting down.")
+                await close_session()
+                await close_browser_pool()
+                close_cache()
+                logger.info("MCP Web server shutting down.")
 
     return Starlette(
         debug=debug,
@@ -340,15 +377,56 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
     )
 
 
-def main() -> None:
-    load_dotenv()
+def build_app() -> Starlette:
+    """uvicorn 多 worker 模式的 app 工厂，每个 worker 进程各自构建一次。"""
+    debug = os.getenv("UMAMUSUME_MCP_DEBUG") == "1"
+    return create_starlette_app(mcp._mcp_server, debug=debug)
+
+
+def _uvicorn_log_config() -> dict:
+    # 包内日志复用 uvicorn 的 handler/formatter，与访问日志一起输出
+    log_config = copy.deepcopy(uvicorn.config.LOGGING_CONFIG)
+    log_config["loggers"]["umamusume_web_crawler"] = {
+        "handlers": ["default"],
+        "level": "INFO",
+        "propagate": False,
+    }
+    return log_config
+
+
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run Umamusume Web MCP server")
     parser.add_argument("--http", action="store_true", help="Use StreamableHTTP + SSE")
     parser.add_argument("--sse", action="store_true", help="Alias for --http")
     parser.add_argument("--host", default=None, help="Host to bind to")
     parser.add_argument("--port", "-p", type=int, default=None, help="Port to listen on")
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable Starlette debug mode (verbose tracebacks in error responses).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of uvicorn worker processes for --http (default: 1). "
+            "SSE sessions live in one process, so use >1 only with /mcp clients."
+        ),
+    )
+    return parser
+
+
+def main() -> None:
+    if not dotenv_disabled():
+        load_dotenv()
+    parser = _build_parser()
     args = parser.parse_args()
 
+    # mcp.run() 内部走 anyio.run，只能通过事件循环策略切换到 uvloop
+    install_uvloop()
+
     use_http = args.http or args.sse
     if not use_http and (args.host or args.port):
         parser.error(
@@ -356,12 +434,28 @@ def main() -> None:
         )
         sys.exit(1)
 
+    if args.workers < 1:
+        parser.error("--workers must be at least 1.")
+
     if use_http:
-        starlette_app = create_starlette_app(mcp._mcp_server, debug=True)
+        if args.debug:
+            # worker 进程通过 build_app 读取，单进程模式同样走这里
+            os.environ["UMAMUSUME_MCP_DEBUG"] = "1"
+        if args.workers > 1:
+            # 多进程需要可导入的 app 工厂，而不是 app 实例
+            app = "umamusume_web_crawler.mcp.server:build_app"
+        else:
+            app = build_app()
         uvicorn.run(
-            starlette_app,
+            app,
+            factory=args.workers > 1,
+            workers=args.workers,
             host=args.host if args.host else "127.0.0.1",
             port=args.port if args.port else 7777,
+            log_config=_uvicorn_log_config(),
+            # auto: 安装了 uvloop/httptools 时优先使用，否则回退到 asyncio/h11
+            loop="auto",
+            http="auto",
         )
     else:
         mcp.run()
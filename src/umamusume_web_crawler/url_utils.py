@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+HTTP_PREFIXES = ("http://", "https://")
+_SITE_HOSTS = tuple(
+    (mode, domain, f".{domain}")
+    for mode, domain in (
+        ("biligame", "wiki.biligame.com"),
+        ("moegirl", "moegirl.org.cn"),
+        ("umamusu", "umamusu.wiki"),
+    )
+)
+
+
+@lru_cache(maxsize=4096)
+def detect_mode(url: str) -> str:
+    host = urlparse(url).hostname or ""
+    for mode, domain, subdomain_suffix in _SITE_HOSTS:
+        if host == domain or host.endswith(subdomain_suffix):
+            return mode
+    return "generic"
+
+
+@lru_cache(maxsize=4096)
+def title_from_url(value: str) -> str:
+    if not value.startswith(HTTP_PREFIXES):
+        return value
+    if "/index.php" not in value:
+        # 常见的 /wiki/Title 链接：不走 urlparse/parse_qs
+        path = value.split("#", 1)[0].split("?", 1)[0]
+        head, _, last = path.rstrip("/").rpartition("/")
+        if head.endswith(":/"):
+            return ""
+        return unquote(last)
+    parsed = urlparse(value)
+    if parsed.path.endswith("/index.php"):
+        title = parse_qs(parsed.query).get("title", [""])[0]
+        if title:
+            return title
+    return unquote(parsed.path.strip("/").split("/")[-1])
+
+
+@lru_cache(maxsize=4096)
+def build_wiki_url(base_url: str, title: str) -> str:
+    return f"{base_url}{quote(title)}"
+
+
+def clear_url_caches() -> None:
+    detect_mode.cache_clear()
+    title_from_url.cache_clear()
+    build_wiki_url.cache_clear()
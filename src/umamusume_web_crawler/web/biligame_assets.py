@@ -14,14 +14,16 @@ from bs4 import BeautifulSoup, Tag
 from crawl4ai import AsyncWebCrawler
 from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig, ProxyConfig
 
-from umamusume_web_crawler.config import config
+from umamusume_web_crawler.config import (
+    DEFAULT_AUDIO_OUTPUT_ROOT,
+    DEFAULT_CHARACTERS_JSON,
+    DEFAULT_IMAGE_OUTPUT_ROOT,
+    config,
+)
 from umamusume_web_crawler.web.crawler import SingleProxyRotationStrategy
 
 
 BASE_URL = "https://wiki.biligame.com/umamusume/"
-DEFAULT_AUDIO_OUTPUT_ROOT = "results/voicedata"
-DEFAULT_IMAGE_OUTPUT_ROOT = "results/imagedata/characters"
-DEFAULT_CHARACTERS_JSON = "umamusume_characters.json"
 DEFAULT_ASSET_MANIFEST = ".biligame_asset_manifest.json"
 IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif")
 _REAL_USER_AGENT = (
@@ -34,6 +36,8 @@ _RATE_LIMIT_PATTERN = re.compile(
     r"too many requests|rate.?limit",
     re.IGNORECASE,
 )
+_INVALID_FILENAME_PATTERN = re.compile(r'[\\/:*?"<>|]+')
+_MEDIA_FILENAME_PATTERN = re.compile(r"文件:([^#?]+)")
 
 
 @dataclass(frozen=True)
@@ -164,14 +168,14 @@ def parse_image_srcset(srcset: str) -> str | None:
 
 def sanitize_filename(name: str, fallback: str) -> str:
     cleaned = name.strip().replace(" ", "_")
-    cleaned = re.sub(r'[\\/:*?"<>|]+', "_", cleaned)
+    cleaned = _INVALID_FILENAME_PATTERN.sub("_", cleaned)
     cleaned = cleaned.strip("._")
     return cleaned or fallback
 
 
 def extract_media_filename(text: str) -> str | None:
     decoded = unquote(text)
-    match = re.search(r"文件:([^#?]+)", decoded)
+    match = _MEDIA_FILENAME_PATTERN.search(decoded)
     if match:
         return match.group(1).strip()
     return None
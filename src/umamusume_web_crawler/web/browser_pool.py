@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator, Callable, Hashable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from crawl4ai import AsyncWebCrawler
+
+# 每种浏览器配置最多保留的空闲实例数，以及空闲多久后关闭
+POOL_MAX_IDLE = 4
+POOL_IDLE_TTL_S = 300.0
+
+
+class BrowserPool:
+    """按浏览器配置复用已启动的 AsyncWebCrawler，省去每次抓取的 Chromium 冷启动。"""
+
+    def __init__(
+        self, *, max_idle: int = POOL_MAX_IDLE, idle_ttl_s: float = POOL_IDLE_TTL_S
+    ) -> None:
+        self.max_idle = max_idle
+        self.idle_ttl_s = idle_ttl_s
+        self._idle: dict[Hashable, list[tuple[AsyncWebCrawler, float]]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 浏览器连接绑定在创建它的事件循环上，换循环后旧实例无法复用
+            self._idle.clear()
+            self._loop = loop
+
+    async def _evict_expired(self) -> None:
+        deadline = time.monotonic() - self.idle_ttl_s
+        expired: list[AsyncWebCrawler] = []
+        for entries in self._idle.values():
+            expired.extend(crawler for crawler, since in entries if since < deadline)
+            entries[:] = [entry for entry in entries if entry[1] >= deadline]
+        for crawler in expired:
+            await _close_quietly(crawler)
+
+    @contextlib.asynccontextmanager
+    async def acquire(
+        self, key: Hashable, factory: Callable[[], AsyncWebCrawler]
+    ) -> AsyncIterator[AsyncWebCrawler]:
+        self._bind_loop()
+        await self._evict_expired()
+        entries = self._idle.get(key)
+        if entries:
+            crawler = entries.pop()[0]
+        else:
+            crawler = factory()
+            await crawler.start()
+        released = False
+        try:
+            yield crawler
+            released = True
+        finally:
+            # 抓取出错或被取消时浏览器状态不可信，直接关闭不放回
+            if released and len(self._idle.setdefault(key, [])) < self.max_idle:
+                self._idle[key].append((crawler, time.monotonic()))
+            else:
+                await _close_quietly(crawler)
+
+    async def close(self) -> None:
+        idle = self._idle
+        self._idle = {}
+        self._loop = None
+        for entries in idle.values():
+            for crawler, _ in entries:
+                await _close_quietly(crawler)
+
+
+async def _close_quietly(crawler: AsyncWebCrawler) -> None:
+    with contextlib.suppress(Exception):
+        await crawler.close()
+
+
+browser_pool = BrowserPool()
+
+
+async def close_browser_pool() -> None:
+    await browser_pool.close()
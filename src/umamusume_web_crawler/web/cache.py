@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+
+from umamusume_web_crawler.config import ROOT_DIR, config
+
+
+_CACHE_FILENAME = "wiki_markdown.sqlite3"
+_MEMORY_CACHE_SIZE = 512
+# 进程内一级缓存，命中时不再访问 sqlite：key -> (created_at, markdown)
+# 读写可能来自 to_thread 的工作线程，用独立的锁保护，命中时不必等待 sqlite
+_memory_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+_memory_lock = threading.Lock()
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS markdown_cache ("
+    "key TEXT PRIMARY KEY, markdown TEXT NOT NULL, created_at REAL NOT NULL);"
+    "CREATE TABLE IF NOT EXISTS http_validators ("
+    "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB NOT NULL, "
+    "created_at REAL NOT NULL DEFAULT 0);"
+    "CREATE TABLE IF NOT EXISTS http_bodies ("
+    "url TEXT PRIMARY KEY, body BLOB NOT NULL, created_at REAL NOT NULL);"
+)
+_TABLES = ("markdown_cache", "http_validators", "http_bodies")
+# 过期行与超出上限的旧行定期清理，长驻的 MCP 服务里缓存库不会无限增长
+_PRUNE_INTERVAL_S = 300.0
+_MAX_ROWS_PER_TABLE = 5000
+_last_prune = 0.0
+
+# 整个进程共用一个连接，建表只在打开时做一次；可能从 to_thread 的工作线程访问，用锁串行化
+_conn: sqlite3.Connection | None = None
+_conn_path: Path | None = None
+_conn_lock = threading.Lock()
+
+
+def _resolve_cache_path() -> Path:
+    if config.crawler_cache_dir:
+        cache_dir = Path(config.crawler_cache_dir).expanduser()
+    else:
+        cache_dir = ROOT_DIR / ".cache"
+    return cache_dir / _CACHE_FILENAME
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn, _conn_path
+    path = _resolve_cache_path()
+    if _conn is None or _conn_path != path:
+        # 缓存目录可在运行时修改（测试、CLI 参数），目录变化时换新连接
+        _close_connection()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.executescript(_SCHEMA)
+        columns = {
+            row[1] for row in conn.execute("PRAGMA table_info(http_validators)")
+        }
+        if "created_at" not in columns:
+            # 旧版本建的表没有写入时间，补上后旧行按已过期处理
+            conn.execute(
+                "ALTER TABLE http_validators "
+                "ADD COLUMN created_at REAL NOT NULL DEFAULT 0"
+            )
+        for table in _TABLES:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_created_at "
+                f"ON {table} (created_at)"
+            )
+        conn.commit()
+        _conn, _conn_path = conn, path
+    return _conn
+
+
+@contextlib.contextmanager
+def _transaction() -> Iterator[sqlite3.Connection]:
+    with _conn_lock:
+        conn = _connect()
+        with conn:
+            yield conn
+
+
+def _close_connection() -> None:
+    global _conn, _conn_path, _last_prune
+    conn = _conn
+    _conn, _conn_path = None, None
+    _last_prune = 0.0
+    if conn is not None:
+        conn.close()
+
+
+def _maybe_prune(conn: sqlite3.Connection, now: float) -> None:
+    global _last_prune
+    if now - _last_prune < _PRUNE_INTERVAL_S:
+        return
+    _last_prune = now
+    deadline = now - config.crawler_cache_ttl_s
+    for table in _TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE created_at < ?", (deadline,))
+        conn.execute(
+            f"DELETE FROM {table} WHERE rowid IN ("
+            f"SELECT rowid FROM {table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (_MAX_ROWS_PER_TABLE,),
+        )
+
+
+def close_cache() -> None:
+    with _conn_lock:
+        _close_connection()
+
+
+def markdown_cache_key(url: str, site: str, *, max_depth: int, max_pages: int) -> str:
+    return f"{site}:{max_depth}:{max_pages}:{url}"
+
+
+def page_cache_key(name: str, url: str, options: dict[str, object]) -> str:
+    # 浏览器抓取结果与 API 抓取结果共用一张表，用前缀区分
+    return f"page:{name}:{json.dumps(options, sort_keys=True)}:{url}"
+
+
+def _remember(key: str, created_at: float, markdown: str) -> None:
+    with _memory_lock:
+        _memory_cache[key] = (created_at, markdown)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > _MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def clear_memory_cache() -> None:
+    with _memory_lock:
+        _memory_cache.clear()
+
+
+def load_cached_markdown(key: str) -> str | None:
+    ttl_s = config.crawler_cache_ttl_s
+    if ttl_s <= 0:
+        return None
+    with _memory_lock:
+        entry = _memory_cache.get(key)
+        if entry is not None:
+            created_at, markdown = entry
+            if time.time() - created_at <= ttl_s:
+                _memory_cache.move_to_end(key)
+                return markdown
+            del _memory_cache[key]
+    with _transaction() as conn:
+        row = conn.execute(
+            "SELECT markdown, created_at FROM markdown_cache WHERE key = ?", (key,)
+        ).fetchone()
+    if row is None:
+        return None
+    markdown, created_at = row
+    if time.time() - created_at > ttl_s:
+        return None
+    _remember(key, created_at, markdown)
+    return markdown
+
+
+def store_cached_markdown(key: str, markdown: str) -> None:
+    if config.crawler_cache_ttl_s <= 0 or not markdown:
+        return
+    created_at = time.time()
+    _remember(key, created_at, markdown)
+    with _transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO markdown_cache (key, markdown, created_at) "
+            "VALUES (?, ?, ?)",
+            (key, markdown, created_at),
+        )
+        _maybe_prune(conn, created_at)
+
+
+HttpValidators = tuple[str | None, str | None, bytes]
+
+
+def load_http_cache(url: str) -> tuple[HttpValidators | None, bytes | None]:
+    """一次查询返回 ((ETag, Last-Modified, 上次的响应体), TTL 内可直接复用的响应体)。
+
+    有校验字段时只返回前者，由调用方发条件请求；否则返回未过期的响应体。
+    """
+    ttl_s = config.crawler_cache_ttl_s
+    if ttl_s <= 0:
+        return None, None
+    with _transaction() as conn:
+        validators = conn.execute(
+            "SELECT etag, last_modified, body FROM http_validators WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if validators is not None:
+            return validators, None
+        row = conn.execute(
+            "SELECT body, created_at FROM http_bodies WHERE url = ?", (url,)
+        ).fetchone()
+    if row is None or time.time() - row[1] > ttl_s:
+        return None, None
+    return None, row[0]
+
+
+def store_http_validators(
+    url: str, *, etag: str | None, last_modified: str | None, body: bytes
+) -> None:
+    if config.crawler_cache_ttl_s <= 0 or not (etag or last_modified):
+        return
+    now = time.time()
+    with _transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO http_validators "
+            "(url, etag, last_modified, body, created_at) VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, body, now),
+        )
+        _maybe_prune(conn, now)
+
+
+def store_http_body(url: str, body: bytes) -> None:
+    if config.crawler_cache_ttl_s <= 0 or not body:
+        return
+    now = time.time()
+    with _transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO http_bodies (url, body, created_at) "
+            "VALUES (?, ?, ?)",
+            (url, body, now),
+        )
+        _maybe_prune(conn, now)
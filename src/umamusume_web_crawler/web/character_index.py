@@ -28,6 +28,7 @@ _ICON_PATTERN = re.compile(r"^Chr icon (\d+) (\d+) 01\.png$")
 _COSTUME_PREFIX_PATTERN = re.compile(r"^[【〖][^】〗]+[】〗]\s*")
 _KANA_PATTERN = re.compile(r"[\u3040-\u30ff]")
 _CJK_PATTERN = re.compile(r"[\u3400-\u9fff]")
+_NON_ALNUM_PATTERN = re.compile(r"[^a-z0-9]+")
 _REAL_USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -36,7 +37,7 @@ _REAL_USER_AGENT = (
 
 
 def normalize_name(value: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "", value.casefold())
+    return _NON_ALNUM_PATTERN.sub("", value.casefold())
 
 
 def strip_costume_prefix(value: str) -> str:
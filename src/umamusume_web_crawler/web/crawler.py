@@ -2,14 +2,24 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import binascii
+import contextlib
+import contextvars
+import functools
 import hashlib
-import json
+import inspect
+import itertools
+import logging
+import os
+import random
 import re
 import shutil
 import tempfile
+from collections.abc import AsyncIterator, Awaitable, Callable
 from pathlib import Path
 from urllib.parse import parse_qs, quote, unquote, urlparse
 
+import soupsieve as sv
 from bs4 import BeautifulSoup
 from crawl4ai import AsyncWebCrawler
 from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig, ProxyConfig
@@ -17,6 +27,21 @@ from crawl4ai.content_filter_strategy import PruningContentFilter
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 
 from umamusume_web_crawler.config import config
+from umamusume_web_crawler.web.browser_pool import browser_pool
+from umamusume_web_crawler.web.cache import (
+    load_cached_markdown,
+    page_cache_key,
+    store_cached_markdown,
+)
+from umamusume_web_crawler.web.http_client import json_dumps
+from umamusume_web_crawler.web.process import convert_markitdown_async
+
+try:
+    import pybase64 as _b64
+except ImportError:  # pragma: no cover - pybase64 is an optional SIMD speedup
+    _b64 = base64
+
+logger = logging.getLogger(__name__)
 
 
 class SingleProxyRotationStrategy:
@@ -34,28 +59,32 @@ class UmamusumeCrawler:
         :param keep_files: 是否保留文件。如果使用临时目录，该选项通常为 False。
         """
         self.keep_files = keep_files
+        self.is_temp = not workspace
+        self._workspace = Path(workspace) if workspace else None
         self._temp_dir: tempfile.TemporaryDirectory | None = None
-
-        if workspace:
-            self.work_dir = Path(workspace)
-            self.work_dir.mkdir(parents=True, exist_ok=True)
-            self.is_temp = False
-        else:
-            if keep_files:
-                self.work_dir = Path(tempfile.mkdtemp(prefix="umamusume_crawl_"))
-                self.is_temp = True
+        self._work_dir: Path | None = None
+
+    @property
+    def work_dir(self) -> Path:
+        # 首次使用时才创建目录，只做逻辑上下文的实例不产生文件系统调用
+        if self._work_dir is None:
+            if self._workspace is not None:
+                self._workspace.mkdir(parents=True, exist_ok=True)
+                self._work_dir = self._workspace
+            elif self.keep_files:
+                self._work_dir = Path(tempfile.mkdtemp(prefix="umamusume_crawl_"))
             else:
                 self._temp_dir = tempfile.TemporaryDirectory(prefix="umamusume_crawl_")
-                self.work_dir = Path(self._temp_dir.name)
-                self.is_temp = True
+                self._work_dir = Path(self._temp_dir.name)
+        return self._work_dir
 
     def _get_file_path(self, url: str, ext: str) -> Path:
-        url_hash = hashlib.md5(url.encode("utf-8")).hexdigest()
+        url_hash = hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest()
         ext = ext.lstrip(".")
         return self.work_dir / f"{url_hash}.{ext}"
 
     def cleanup(self) -> None:
-        if not self.is_temp or self.keep_files:
+        if not self.is_temp or self.keep_files or self._work_dir is None:
             return
         if self._temp_dir is not None:
             self._temp_dir.cleanup()
@@ -84,6 +113,17 @@ _REAL_USER_AGENT = (
     "Chrome/123.0.0.0 Safari/537.36"
 )
 
+_BROWSER_HEADERS = {
+    "User-Agent": _REAL_USER_AGENT,
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Referer": "https://www.google.com/",
+}
+_BROWSER_EXTRA_ARGS = (
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-infobars",
+)
+
 _STEALTH_JS = (
     "Object.defineProperty(navigator,'webdriver',{get:()=>undefined});"
 )
@@ -119,8 +159,8 @@ def _resolve_output_dir(
         return workspace.work_dir, None
     if workspace is None and require_output_dir:
         raise ValueError("output_dir or workspace is required to retain capture files.")
+    # 新建实例首次访问 work_dir 时即创建目录
     crawler = UmamusumeCrawler(workspace=workspace, keep_files=keep_files)
-    crawler.work_dir.mkdir(parents=True, exist_ok=True)
     return crawler.work_dir, crawler
 
 
@@ -134,8 +174,131 @@ def _resolve_timeout(timeout_s: float | None) -> float | None:
     return config.crawler_timeout_s if timeout_s is None else timeout_s
 
 
-async def _run_with_timeout(coro, timeout_s: float | None) -> object:
-    return await _await_with_timeout(coro, _resolve_timeout(timeout_s))
+_browser_slots: dict[str, asyncio.Semaphore] = {}
+_browser_slots_loop: asyncio.AbstractEventLoop | None = None
+# 嵌套调用（如 markitdown 包装内再调 visual 抓取）沿用外层同类名额，避免自锁；
+# 按名额类型分别记录，持有 crawl 名额不能跳过 visual 的并发上限
+_held_browser_slots: contextvars.ContextVar[frozenset[str]] = contextvars.ContextVar(
+    "_held_browser_slots", default=frozenset()
+)
+
+
+def _browser_slot_semaphore(kind: str) -> asyncio.Semaphore:
+    global _browser_slots_loop
+    loop = asyncio.get_running_loop()
+    if _browser_slots_loop is not loop:
+        _browser_slots.clear()
+        _browser_slots_loop = loop
+    semaphore = _browser_slots.get(kind)
+    if semaphore is None:
+        limit = (
+            config.crawler_visual_concurrency
+            if kind == "visual"
+            else config.crawler_browser_concurrency
+        )
+        semaphore = asyncio.Semaphore(max(1, limit))
+        _browser_slots[kind] = semaphore
+    return semaphore
+
+
+@contextlib.asynccontextmanager
+async def _browser_slot(kind: str) -> AsyncIterator[None]:
+    held = _held_browser_slots.get()
+    if kind in held:
+        yield
+        return
+    async with _browser_slot_semaphore(kind):
+        token = _held_browser_slots.set(held | {kind})
+        try:
+            yield
+        finally:
+            _held_browser_slots.reset(token)
+
+
+async def _run_with_timeout(
+    factory: Callable[[], Awaitable[object]],
+    timeout_s: float | None,
+    *,
+    slot: str | None = None,
+) -> object:
+    if slot is None:
+        return await _await_with_timeout(factory(), _resolve_timeout(timeout_s))
+    # 先拿到浏览器名额再创建协程并开始计时：排队时间不计入超时，
+    # 排队中被取消也不会留下从未 await 的协程
+    async with _browser_slot(slot):
+        return await _await_with_timeout(factory(), _resolve_timeout(timeout_s))
+
+
+@contextlib.asynccontextmanager
+async def _open_crawler(
+    browser_cfg: BrowserConfig,
+    crawler: AsyncWebCrawler | None,
+    *,
+    verbose: bool,
+) -> AsyncIterator[AsyncWebCrawler]:
+    # 调用方传入已启动的 crawler 时复用其浏览器，只为本次抓取新开页面
+    if crawler is not None:
+        yield crawler
+        return
+    key = (
+        browser_cfg.headless,
+        browser_cfg.enable_stealth,
+        browser_cfg.user_data_dir,
+        verbose,
+    )
+    async with browser_pool.acquire(
+        key, lambda: AsyncWebCrawler(config=browser_cfg, verbose=verbose)
+    ) as pooled:
+        yield pooled
+
+
+_host_limits: dict[str, asyncio.Semaphore] = {}
+_host_limits_loop: asyncio.AbstractEventLoop | None = None
+_GATEWAY_RETRIES = 3
+_GATEWAY_PAGE_MAX_CHARS = 16384
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    global _host_limits_loop
+    loop = asyncio.get_running_loop()
+    if _host_limits_loop is not loop:
+        # Semaphore 绑定事件循环，换循环后重新创建
+        _host_limits.clear()
+        _host_limits_loop = loop
+    host = urlparse(url).netloc
+    semaphore = _host_limits.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, config.crawler_host_concurrency))
+        _host_limits[host] = semaphore
+    return semaphore
+
+
+async def _arun(
+    crawler: AsyncWebCrawler,
+    url: str,
+    run_config: CrawlerRunConfig,
+    timeout_s: float | None,
+    *,
+    gateway_retries: int = _GATEWAY_RETRIES,
+) -> object:
+    """按站点限流执行 arun；遇到网关超时页时指数退避后重试，重试用尽仍是网关页则抛错。"""
+    for attempt in range(gateway_retries + 1):
+        if attempt:
+            # 退避期间不占用站点并发名额
+            await asyncio.sleep(min(2 ** (attempt - 1), 30) + random.random())
+        async with _host_semaphore(url):
+            try:
+                result = await _await_with_timeout(
+                    crawler.arun(url=url, config=run_config), timeout_s
+                )
+            except asyncio.TimeoutError:
+                # 超时的会话页面可能仍卡在导航中，关掉它让重试或后续抓取拿到新页面
+                await _kill_session(crawler, getattr(run_config, "session_id", None))
+                raise
+        if not _looks_like_gateway_timeout(_get_result_html(result)):
+            return result
+    # 不能把网关错误页当作正常内容返回，否则会被页面缓存存下来
+    raise RuntimeError(f"Gateway timeout page returned for {url}.")
 
 
 def _resolve_user_data_dir() -> str | None:
@@ -147,8 +310,36 @@ def _resolve_user_data_dir() -> str | None:
     return str(path)
 
 
+def build_browser_config(
+    *, headless: bool = True, anti_bot: bool = False
+) -> BrowserConfig:
+    """抓取函数使用的浏览器配置；批量抓取时可据此创建共享的 AsyncWebCrawler。"""
+    user_data_dir = _resolve_user_data_dir()
+    # crawl4ai 会往 headers 里写 sec-ch-ua，每个配置都要拿到自己的副本
+    return BrowserConfig(
+        headless=headless,
+        user_agent=_REAL_USER_AGENT,
+        viewport_width=1920,
+        viewport_height=1080,
+        headers=dict(_BROWSER_HEADERS),
+        use_managed_browser=bool(user_data_dir),
+        user_data_dir=user_data_dir,
+        extra_args=list(_BROWSER_EXTRA_ARGS),
+        enable_stealth=anti_bot,
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _literal_alternation(markers: tuple[str, ...]) -> re.Pattern[str]:
+    # 多个字面量合成一个正则，每行只扫描一次
+    return re.compile("|".join(map(re.escape, markers)))
+
+
 def _strip_json_blocks(text: str, markers: tuple[str, ...]) -> str:
     lines = text.splitlines()
+    marker_re = _literal_alternation(markers)
+    if marker_re.search(text) is None:
+        return "\n".join(lines)
     cleaned: list[str] = []
     skipping = False
     depth = 0
@@ -158,7 +349,7 @@ def _strip_json_blocks(text: str, markers: tuple[str, ...]) -> str:
             if depth <= 0:
                 skipping = False
             continue
-        if any(marker in line for marker in markers):
+        if marker_re.search(line):
             depth = line.count("[") - line.count("]")
             if depth > 0:
                 skipping = True
@@ -182,6 +373,14 @@ def _build_pruning_markdown_generator(
         if min_word_threshold is None
         else min_word_threshold
     )
+    return _pruning_markdown_generator(threshold, min_word_threshold)
+
+
+@functools.lru_cache(maxsize=8)
+def _pruning_markdown_generator(
+    threshold: float, min_word_threshold: int
+) -> DefaultMarkdownGenerator:
+    # 与 _md_generator 一样在并发 arun 间共享：过滤器只在构造时写入配置
     return DefaultMarkdownGenerator(
         content_filter=PruningContentFilter(
             threshold=threshold, min_word_threshold=min_word_threshold
@@ -190,11 +389,15 @@ def _build_pruning_markdown_generator(
     )
 
 
+_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
 def _sanitize_filename(value: str) -> str:
-    cleaned = re.sub(r"[^A-Za-z0-9._-]+", "_", value).strip("._")
+    cleaned = _FILENAME_RE.sub("_", value).strip("._")
     return cleaned or "page"
 
 
+@functools.lru_cache(maxsize=1024)
 def _slug_from_url(url: str) -> str:
     parsed = urlparse(url)
     domain = _sanitize_filename(parsed.netloc or "")
@@ -219,37 +422,57 @@ def _apply_optional_config(config_obj: object, values: dict[str, object]) -> Non
                 continue
 
 
+def _decode_base64(value: str) -> bytes | None:
+    if value.startswith("data:") and "," in value:
+        value = value.split(",", 1)[1]
+    # validate=True 成功时结果与宽松解码一致，失败后原本也会退回宽松解码，只解一次即可
+    try:
+        return _b64.b64decode(value)
+    except (binascii.Error, ValueError):
+        return None
+
+
 def _extract_capture_bytes(value: object) -> bytes | None:
     if isinstance(value, bytes):
         return value
     if isinstance(value, str):
-        if value.startswith("data:") and "," in value:
-            value = value.split(",", 1)[1]
-        try:
-            return base64.b64decode(value, validate=True)
-        except Exception:
-            try:
-                return base64.b64decode(value)
-            except Exception:
-                return None
+        return _decode_base64(value)
     if isinstance(value, dict):
         for key in ("data", "base64"):
             nested = value.get(key)
             if isinstance(nested, bytes):
                 return nested
             if isinstance(nested, str):
-                if nested.startswith("data:") and "," in nested:
-                    nested = nested.split(",", 1)[1]
-                try:
-                    return base64.b64decode(nested, validate=True)
-                except Exception:
-                    try:
-                        return base64.b64decode(nested)
-                    except Exception:
-                        continue
+                data = _decode_base64(nested)
+                if data is not None:
+                    return data
     return None
 
 
+def _stream_b64_to_file(value: str, path: Path, chunk_size: int = 1 << 20) -> bool:
+    """分块解码并写入，避免整份截图 / PDF 同时驻留内存；非规整 base64 返回 False。"""
+    if value.startswith("data:") and "," in value:
+        value = value.split(",", 1)[1]
+    # 只处理无换行、填充仅在末尾的规整输入，保证分块结果与整体解码一致
+    if not value or len(value) % 4 or value.find("=", 0, len(value) - 2) != -1:
+        return False
+    # 写入同目录的临时文件，全部解码成功后再替换，失败时不动已有文件
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            for start in range(0, len(value), chunk_size):
+                fh.write(_b64.b64decode(value[start : start + chunk_size], validate=True))
+        os.replace(tmp_path, path)
+    except (binascii.Error, ValueError):
+        tmp_path.unlink(missing_ok=True)
+        return False
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return True
+
+
 def _save_capture_result(
     result: object,
     *,
@@ -262,6 +485,8 @@ def _save_capture_result(
             continue
         if isinstance(value, (str, Path)):
             if isinstance(value, str) and (value.startswith("data:") or len(value) > 512):
+                if _stream_b64_to_file(value, output_path):
+                    return output_path
                 data = _extract_capture_bytes(value)
                 if data:
                     output_path.write_bytes(data)
@@ -288,13 +513,27 @@ def _save_capture_result(
 def _write_pdf_from_png(
     png_path: Path, pdf_path: Path, *, resolution: float = 150.0
 ) -> Path | None:
+    try:
+        import img2pdf
+    except ImportError:
+        pass
+    else:
+        # img2pdf 直接嵌入 PNG 数据流，不做解码和重压缩；带透明通道等情况回退到 Pillow
+        try:
+            layout = img2pdf.get_fixed_dpi_layout_fun((resolution, resolution))
+            pdf_path.write_bytes(img2pdf.convert(str(png_path), layout_fun=layout))
+            return pdf_path
+        except Exception:
+            pass
     try:
         from PIL import Image
     except Exception:
         return None
     try:
         with Image.open(png_path) as image:
-            image = image.convert("RGB")
+            # 已是 RGB 时跳过 convert，避免整张长图再复制一份像素
+            if image.mode != "RGB":
+                image = image.convert("RGB")
             image.save(pdf_path, "PDF", resolution=resolution)
         return pdf_path
     except Exception:
@@ -319,43 +558,56 @@ def _build_print_scale_js(scale: float) -> str:
     )
 
 
+_EMPTY_HTML_FORMS = frozenset(
+    (
+        "<html></html>",
+        "<html><head></head><body></body></html>",
+        "<divclass='crawl4ai-result'></div>",
+        '<divclass="crawl4ai-result"></div>',
+    )
+)
+# 非空白字符多于上面最长的空页面形式时，去空白后不可能与之相等
+_LONGER_THAN_EMPTY_FORMS_RE = re.compile(
+    r"\S(?:\s*\S){%d}" % max(map(len, _EMPTY_HTML_FORMS))
+)
+_BODY_OR_DIV_RE = re.compile(r"<(?:[Bb][Oo][Dd][Yy]|[Dd][Ii][Vv])")
+
+
+def _is_empty_html_form(html: str) -> bool:
+    if _LONGER_THAN_EMPTY_FORMS_RE.search(html):
+        return False
+    return "".join(html.split()).lower() in _EMPTY_HTML_FORMS
+
+
 def _looks_like_empty_html(html: str) -> bool:
-    if not html or not html.strip():
+    if not html or html.isspace():
         return True
+    # 常见的非空页面：原文里已有 <body/<div 且内容足够长，无需构造去空白副本
+    if _BODY_OR_DIV_RE.search(html) and _LONGER_THAN_EMPTY_FORMS_RE.search(html):
+        return False
     normalized = "".join(html.split()).lower()
-    if normalized in ("<html></html>", "<html><head></head><body></body></html>"):
-        return True
-    if normalized in (
-        "<divclass='crawl4ai-result'></div>",
-        "<divclass=\"crawl4ai-result\"></div>",
-    ):
+    if normalized in _EMPTY_HTML_FORMS:
         return True
     if "<body" not in normalized and "<div" not in normalized:
         return True
     return False
 
 
+_GATEWAY_TIMEOUT_RE = re.compile(
+    r"gateway time-out|gateway timeout|504 gateway|>504<", re.I | re.A
+)
+
+
 def _looks_like_gateway_timeout(html: str) -> bool:
-    if not html:
+    # 网关错误页都很短，长页面里出现的 ">504<" 只是正文数字，无需整页扫描
+    if not html or len(html) > _GATEWAY_PAGE_MAX_CHARS:
         return False
-    lowered = html.lower()
-    return (
-        "gateway time-out" in lowered
-        or "gateway timeout" in lowered
-        or "504 gateway" in lowered
-        or ">504<" in lowered
-    )
+    return _GATEWAY_TIMEOUT_RE.search(html) is not None
 
 
 def _extract_text_value(value: object) -> str:
     if isinstance(value, str) and value.strip():
-        normalized = "".join(value.split()).lower()
-        if normalized in ("<html></html>", "<html><head></head><body></body></html>"):
-            return ""
-        if normalized in (
-            "<divclass='crawl4ai-result'></div>",
-            "<divclass=\"crawl4ai-result\"></div>",
-        ):
+        if _is_empty_html_form(value):
             return ""
         if value.lstrip().lower().startswith("<html") and _looks_like_empty_html(value):
             return ""
@@ -447,6 +699,7 @@ def _structured_content_size(payload: dict) -> int:
     return total
 
 
+@functools.lru_cache(maxsize=1024)
 def _build_moegirl_render_url(url: str) -> str | None:
     parsed = urlparse(url)
     if not parsed.netloc or not parsed.path:
@@ -466,25 +719,55 @@ def _build_moegirl_render_url(url: str) -> str | None:
     return f"{parsed.scheme}://{parsed.netloc}/index.php?title={quote(title)}&action=render"
 
 
-def _extract_mediawiki_text(html: str) -> str:
+# 选择器在导入时编译一次，避免每页重新解析 CSS
+_SV_PARSER_OUTPUT = sv.compile(".mw-parser-output")
+_SV_CONTENT_TEXT = sv.compile("#mw-content-text")
+_SV_FIRST_HEADING = sv.compile("#firstHeading")
+_SV_NOISE = sv.compile("script, style, noscript, textarea")
+_SV_HIDDEN_CANDIDATES = sv.compile("[hidden], [aria-hidden], [style]")
+_SV_CHROME = sv.compile(
+    ".mw-editsection, .toc, .navbox, .navbar, .metadata, "
+    "#mw-navigation, #footer, .ads, .comments"
+)
+
+
+def _select_mediawiki_main(soup: BeautifulSoup) -> object | None:
+    return _SV_PARSER_OUTPUT.select_one(soup) or _SV_CONTENT_TEXT.select_one(soup)
+
+
+def _parse_html(html: str) -> BeautifulSoup | None:
+    if not html:
+        return None
+    return BeautifulSoup(html, "lxml")
+
+
+def _extract_mediawiki_text(html: str, *, soup: BeautifulSoup | None = None) -> str:
     if not html:
         return ""
-    soup = BeautifulSoup(html, "lxml")
-    main = (
-        soup.select_one(".mw-parser-output")
-        or soup.select_one("#mw-content-text")
-        or soup.body
-    )
+    if soup is None:
+        soup = _parse_html(html)
+    main = _select_mediawiki_main(soup) or soup.body
     if not main:
         return ""
     return main.get_text("\n", strip=True)
 
 
-def _has_mediawiki_content(html: str) -> bool:
+# 正文容器的 class / id 不出现在源码里时，无需解析即可判定没有正文
+_MEDIAWIKI_MAIN_MARKER_RE = re.compile(r"mw-parser-output|mw-content-text", re.I)
+
+
+def _has_mediawiki_markers(html: str) -> bool:
+    return _MEDIAWIKI_MAIN_MARKER_RE.search(html) is not None
+
+
+def _has_mediawiki_content(html: str, *, soup: BeautifulSoup | None = None) -> bool:
     if not html or not html.strip():
         return False
-    soup = BeautifulSoup(html, "lxml")
-    main = soup.select_one(".mw-parser-output") or soup.select_one("#mw-content-text")
+    if not _has_mediawiki_markers(html):
+        return False
+    if soup is None:
+        soup = _parse_html(html)
+    main = _select_mediawiki_main(soup)
     if not main:
         return False
     if main.find("table"):
@@ -538,9 +821,13 @@ _NOISE_SNIPPETS = (
     "WIKI功能->编辑",
     "首页",
 )
+_NOISE_RE = _literal_alternation(_NOISE_SNIPPETS)
 
 def _strip_hidden_elements(soup: BeautifulSoup) -> None:
-    for tag in soup.find_all(True):
+    # 只检查带相关属性的节点；style 的判定仍在 Python 中做，保留原有的去空格语义
+    for tag in _SV_HIDDEN_CANDIDATES.select(soup):
+        if tag.decomposed:
+            continue
         attrs = tag.attrs or {}
         if "hidden" in attrs:
             tag.decompose()
@@ -556,22 +843,32 @@ def _strip_hidden_elements(soup: BeautifulSoup) -> None:
 
 
 def _collect_blocks(root: BeautifulSoup) -> list:
-    blocks: list = []
-
-    def walk(node: object) -> None:
-        for child in getattr(node, "children", []):
-            if not getattr(child, "name", None):
-                continue
-            if child.name in _HEADING_TAGS or child.name in _BLOCK_TAGS:
-                blocks.append(child)
-                continue
-            if child.name == "div":
-                if not child.find(list(_HEADING_TAGS + _BLOCK_TAGS), recursive=True):
-                    blocks.append(child)
-                    continue
-            walk(child)
+    block_names = _HEADING_TAGS + _BLOCK_TAGS
+    # 自底向上标记含标题/块级后代的节点，div 判断由子树 find 变为 O(1)
+    has_block: set[int] = set()
+    for found in root.find_all(block_names):
+        parent = found.parent
+        while parent is not None and id(parent) not in has_block:
+            has_block.add(id(parent))
+            parent = parent.parent
 
-    walk(root)
+    blocks: list = []
+    stack = [iter(getattr(root, "children", []))]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            continue
+        name = getattr(child, "name", None)
+        if not name:
+            continue
+        if name in block_names:
+            blocks.append(child)
+            continue
+        if name == "div" and id(child) not in has_block:
+            blocks.append(child)
+            continue
+        stack.append(iter(child.children))
     return blocks
 
 
@@ -588,7 +885,7 @@ def _filter_content_entries(entries: list[str]) -> list[str]:
             continue
         if len(compact) <= 1:
             continue
-        if any(snippet in compact for snippet in _NOISE_SNIPPETS):
+        if _NOISE_RE.search(compact):
             continue
         key = compact.lower()
         if key in seen:
@@ -598,19 +895,21 @@ def _filter_content_entries(entries: list[str]) -> list[str]:
     return cleaned
 
 
-def _extract_mediawiki_structured(html: str, *, source_url: str) -> dict:
+def _extract_mediawiki_structured(
+    html: str, *, source_url: str, soup: BeautifulSoup | None = None
+) -> dict:
+    # 注意：会就地删除 soup 中的噪声节点，传入的 soup 之后不应再复用
     if not html:
         return {}
-    soup = BeautifulSoup(html, "lxml")
-    for tag in soup.select("script, style, noscript, textarea"):
+    if soup is None:
+        soup = _parse_html(html)
+    for tag in _SV_NOISE.select(soup):
         tag.decompose()
-    for tag in soup.select(
-        ".mw-editsection, .toc, .navbox, .navbar, .metadata, #mw-navigation, #footer, .ads, .comments"
-    ):
+    for tag in _SV_CHROME.select(soup):
         tag.decompose()
     _strip_hidden_elements(soup)
 
-    title_node = soup.select_one("#firstHeading") or soup.select_one("title")
+    title_node = _SV_FIRST_HEADING.select_one(soup) or soup.find("title")
     title = title_node.get_text(" ", strip=True) if title_node else ""
     if not title:
         parsed = urlparse(source_url)
@@ -619,11 +918,7 @@ def _extract_mediawiki_structured(html: str, *, source_url: str) -> dict:
             title = params.get("title", [""])[0]
         else:
             title = unquote(parsed.path.strip("/").split("/")[-1])
-    root = (
-        soup.select_one(".mw-parser-output")
-        or soup.select_one("#mw-content-text")
-        or soup.body
-    )
+    root = _select_mediawiki_main(soup) or soup.body
     if not root:
         return {}
 
@@ -677,6 +972,12 @@ def _extract_mediawiki_structured(html: str, *, source_url: str) -> dict:
     }
 
 
+@functools.lru_cache(maxsize=4)
+def _proxy_rotation_strategy(proxy_url: str) -> SingleProxyRotationStrategy:
+    # 策略只返回同一个 ProxyConfig，不会被 crawl4ai 修改，可按代理地址复用
+    return SingleProxyRotationStrategy(ProxyConfig(server=proxy_url))
+
+
 def _build_run_config(
     use_proxy: bool,
     *,
@@ -690,11 +991,7 @@ def _build_run_config(
     extraction_strategy: object | None = None,
 ) -> CrawlerRunConfig:
     proxy_url = config.proxy_url()
-    proxy = (
-        SingleProxyRotationStrategy(ProxyConfig(server=proxy_url))
-        if proxy_url and use_proxy
-        else None
-    )
+    proxy = _proxy_rotation_strategy(proxy_url) if proxy_url and use_proxy else None
     run_config = CrawlerRunConfig(
         markdown_generator=markdown_generator or _md_generator,
         extraction_strategy=extraction_strategy,
@@ -817,43 +1114,31 @@ async def _crawl_with_config(
     prefer_fit_markdown: bool,
     prefer_extracted_content: bool,
     timeout_s: float | None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> str:
     crawl_url = target_url or url
     source_url = source_url or url
     timeout_s = _resolve_timeout(timeout_s)
-    headers = {
-        "User-Agent": _REAL_USER_AGENT,
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        "Referer": "https://www.google.com/",
-    }
-    user_data_dir = _resolve_user_data_dir()
-    browser_cfg = BrowserConfig(
-        headless=headless,
-        user_agent=_REAL_USER_AGENT,
-        viewport_width=1920,
-        viewport_height=1080,
-        headers=headers,
-        use_managed_browser=bool(user_data_dir),
-        user_data_dir=user_data_dir,
-        extra_args=[
-            "--disable-blink-features=AutomationControlled",
-            "--no-sandbox",
-            "--disable-infobars",
-        ],
-        enable_stealth=anti_bot,
-    )
-    async with AsyncWebCrawler(config=browser_cfg, verbose=False) as crawler:
-        result = await _await_with_timeout(
-            crawler.arun(
-                url=crawl_url,
-                config=_build_run_config(
-                    use_proxy,
-                    css_selector=css_selector,
-                    anti_bot=anti_bot,
-                    wait_for_selector=wait_for_selector,
-                    markdown_generator=markdown_generator,
-                    extraction_strategy=extraction_strategy,
-                ),
+    browser_cfg = build_browser_config(headless=headless, anti_bot=anti_bot)
+    # 同一份 HTML 在结构化分支里会被多次检查，只解析一次
+    soups: dict[str, BeautifulSoup | None] = {}
+
+    def soup_for(html: str) -> BeautifulSoup | None:
+        if html not in soups:
+            soups[html] = _parse_html(html)
+        return soups[html]
+
+    async with _open_crawler(browser_cfg, crawler, verbose=False) as crawler:
+        result = await _arun(
+            crawler,
+            crawl_url,
+            _build_run_config(
+                use_proxy,
+                css_selector=css_selector,
+                anti_bot=anti_bot,
+                wait_for_selector=wait_for_selector,
+                markdown_generator=markdown_generator,
+                extraction_strategy=extraction_strategy,
             ),
             timeout_s,
         )
@@ -868,21 +1153,22 @@ async def _crawl_with_config(
 
         if structured:
             if not content and html_snapshot:
-                content = _extract_mediawiki_text(html_snapshot)
+                content = _extract_mediawiki_text(
+                    html_snapshot, soup=soup_for(html_snapshot)
+                )
 
             if css_selector and not content:
-                fallback_result = await _await_with_timeout(
-                    crawler.arun(
-                        url=crawl_url,
-                        config=_build_run_config(
-                            use_proxy,
-                            css_selector=None,
-                            anti_bot=anti_bot,
-                            wait_for_selector="body",
-                            wait_until=None,
-                            markdown_generator=markdown_generator,
-                            extraction_strategy=extraction_strategy,
-                        ),
+                fallback_result = await _arun(
+                    crawler,
+                    crawl_url,
+                    _build_run_config(
+                        use_proxy,
+                        css_selector=None,
+                        anti_bot=anti_bot,
+                        wait_for_selector="body",
+                        wait_until=None,
+                        markdown_generator=markdown_generator,
+                        extraction_strategy=extraction_strategy,
                     ),
                     timeout_s,
                 )
@@ -893,7 +1179,9 @@ async def _crawl_with_config(
                     prefer_extracted_content=prefer_extracted_content,
                 )
                 if not fallback_content and fallback_html:
-                    fallback_content = _extract_mediawiki_text(fallback_html)
+                    fallback_content = _extract_mediawiki_text(
+                        fallback_html, soup=soup_for(fallback_html)
+                    )
                 if fallback_content:
                     content = fallback_content
                 if fallback_html and (
@@ -905,49 +1193,77 @@ async def _crawl_with_config(
             html_ready = (
                 html_snapshot
                 and not _looks_like_empty_html(html_snapshot)
-                and _has_mediawiki_content(html_snapshot)
+                and _has_mediawiki_markers(html_snapshot)
+                and _has_mediawiki_content(html_snapshot, soup=soup_for(html_snapshot))
             )
             if not html_ready and allow_render_fallback:
                 render_url = _build_moegirl_render_url(source_url)
                 if render_url and render_url != crawl_url:
-                    render_result = await _await_with_timeout(
-                        crawler.arun(
-                            url=render_url,
-                            config=_build_run_config(
-                                use_proxy,
-                                css_selector=css_selector,
-                                anti_bot=anti_bot,
-                                wait_for_selector=wait_for_selector,
-                                wait_until=None,
-                                markdown_generator=markdown_generator,
-                                extraction_strategy=extraction_strategy,
-                            ),
+                    render_result = await _arun(
+                        crawler,
+                        render_url,
+                        _build_run_config(
+                            use_proxy,
+                            css_selector=css_selector,
+                            anti_bot=anti_bot,
+                            wait_for_selector=wait_for_selector,
+                            wait_until=None,
+                            markdown_generator=markdown_generator,
+                            extraction_strategy=extraction_strategy,
                         ),
                         timeout_s,
                     )
                     render_html = _get_result_html(render_result)
                     if render_html:
                         html_snapshot = render_html
-                        html_ready = _has_mediawiki_content(render_html)
+                        html_ready = _has_mediawiki_markers(render_html) and (
+                            _has_mediawiki_content(
+                                render_html, soup=soup_for(render_html)
+                            )
+                        )
                         if not content and html_ready:
-                            content = _extract_mediawiki_text(render_html)
+                            content = _extract_mediawiki_text(
+                                render_html, soup=soup_for(render_html)
+                            )
 
             if html_ready:
                 structured_payload = _extract_mediawiki_structured(
-                    html_snapshot, source_url=source_url
+                    html_snapshot,
+                    source_url=source_url,
+                    soup=soup_for(html_snapshot),
                 )
                 if structured_payload:
                     size = _structured_content_size(structured_payload)
                     if size >= 300 or not content:
-                        return json.dumps(
-                            structured_payload, ensure_ascii=False, indent=2
-                        )
+                        return json_dumps(structured_payload)
 
         if content:
             return _post_process_content(url, content)
         return ""
 
 
+_visual_session_ids = itertools.count(1)
+
+
+@contextlib.asynccontextmanager
+async def _scoped_session(
+    crawler: AsyncWebCrawler, session_id: str | None
+) -> AsyncIterator[None]:
+    try:
+        yield
+    finally:
+        # 浏览器会被池复用，抓取结束即关闭会话页面，不等 crawl4ai 的超时回收
+        await _kill_session(crawler, session_id)
+
+
+async def _kill_session(crawler: AsyncWebCrawler, session_id: str | None) -> None:
+    strategy = getattr(crawler, "crawler_strategy", None)
+    manager = getattr(strategy, "browser_manager", None)
+    if session_id and manager is not None:
+        with contextlib.suppress(Exception):
+            await manager.kill_session(session_id)
+
+
 async def _crawl_page_visual(
     url: str,
     *,
@@ -971,58 +1287,46 @@ async def _crawl_page_visual(
     pdf_from_png: bool = False,
     print_scale: float | None = None,
     timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> dict[str, str]:
     crawl_url = target_url or url
     source_url = source_url or url
-    output_dir.mkdir(parents=True, exist_ok=True)
     timeout_s = _resolve_timeout(timeout_s)
     slug = _slug_from_url(source_url)
     png_path = output_dir / f"{slug}.png"
     pdf_path = output_dir / f"{slug}.pdf" if capture_pdf else None
 
-    headers = {
-        "User-Agent": _REAL_USER_AGENT,
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        "Referer": "https://www.google.com/",
-    }
-    user_data_dir = _resolve_user_data_dir()
-    browser_cfg = BrowserConfig(
-        headless=headless,
-        user_agent=_REAL_USER_AGENT,
-        viewport_width=1920,
-        viewport_height=1080,
-        headers=headers,
-        use_managed_browser=bool(user_data_dir),
-        user_data_dir=user_data_dir,
-        extra_args=[
-            "--disable-blink-features=AutomationControlled",
-            "--no-sandbox",
-            "--disable-infobars",
-        ],
-        enable_stealth=anti_bot,
-    )
-    async with AsyncWebCrawler(config=browser_cfg, verbose=True) as crawler:
+    # 预热与截图共用同一个页面会话，预热得到的 cookie 与连接才能被截图请求复用
+    owns_session = session_id is None
+    if owns_session:
+        session_id = f"visual-{slug}-{next(_visual_session_ids)}"
+
+    browser_cfg = build_browser_config(headless=headless, anti_bot=anti_bot)
+    async with (
+        _open_crawler(browser_cfg, crawler, verbose=True) as crawler,
+        _scoped_session(crawler, session_id if owns_session else None),
+    ):
         if preload_url:
             try:
                 preload_timeout = timeout_s if timeout_s and timeout_s > 0 else None
                 if preload_timeout:
                     preload_timeout = min(preload_timeout, 60.0 if anti_bot else 20.0)
-                await _await_with_timeout(
-                    crawler.arun(
-                        url=preload_url,
-                        config=_build_run_config(
-                            use_proxy,
-                            css_selector=None,
-                            anti_bot=False,
-                            wait_for_selector="body",
-                            wait_until="commit",
-                            session_id=session_id,
-                            page_timeout_ms=page_timeout_ms,
-                            markdown_generator=None,
-                            extraction_strategy=None,
-                        ),
+                await _arun(
+                    crawler,
+                    preload_url,
+                    _build_run_config(
+                        use_proxy,
+                        css_selector=None,
+                        anti_bot=False,
+                        wait_for_selector="body",
+                        wait_until="commit",
+                        session_id=session_id,
+                        page_timeout_ms=page_timeout_ms,
+                        markdown_generator=None,
+                        extraction_strategy=None,
                     ),
                     preload_timeout,
+                    gateway_retries=0,
                 )
                 if preload_delay_s:
                     await asyncio.sleep(preload_delay_s)
@@ -1036,8 +1340,27 @@ async def _crawl_page_visual(
             capture_screenshot: bool,
             capture_pdf: bool,
             print_scale_override: float | None,
+            session: str | None = None,
         ) -> tuple[Path | None, Path | None]:
             max_retries = 2 if anti_bot else 1
+            # 重试之间参数不变；crawl4ai 只会回写相同的 url / 代理字段，可复用同一份配置
+            run_cfg = _build_capture_run_config(
+                use_proxy,
+                css_selector=selector,
+                anti_bot=anti_bot,
+                wait_for_selector=wait_for,
+                wait_until=wait_until,
+                session_id=session or session_id,
+                page_timeout_ms=page_timeout_ms,
+                png_path=png_path,
+                pdf_path=pdf_path,
+                capture_screenshot=capture_screenshot,
+                capture_pdf=capture_pdf,
+                screenshot_wait_for=screenshot_wait_for,
+                delay_before_return_html=delay_before_return_html,
+                wait_for_images=wait_for_images,
+                print_scale=print_scale_override,
+            )
             result = None
             last_error: Exception | None = None
             for attempt in range(max_retries):
@@ -1050,32 +1373,13 @@ async def _crawl_page_visual(
                             attempt_timeout = 60.0 if attempt == 0 else min(timeout_s, 30.0)
                         else:
                             attempt_timeout = min(timeout_s, 25.0)
-                    result = await _await_with_timeout(
-                        crawler.arun(
-                            url=crawl_url,
-                            config=_build_capture_run_config(
-                                use_proxy,
-                                css_selector=selector,
-                                anti_bot=anti_bot,
-                                wait_for_selector=wait_for,
-                                wait_until=wait_until,
-                                session_id=session_id,
-                                page_timeout_ms=page_timeout_ms,
-                                png_path=png_path,
-                                pdf_path=pdf_path,
-                                capture_screenshot=capture_screenshot,
-                                capture_pdf=capture_pdf,
-                                screenshot_wait_for=screenshot_wait_for,
-                                delay_before_return_html=delay_before_return_html,
-                                wait_for_images=wait_for_images,
-                                print_scale=print_scale_override,
-                            ),
-                        ),
+                    result = await _arun(
+                        crawler,
+                        crawl_url,
+                        run_cfg,
                         attempt_timeout,
+                        gateway_retries=0,
                     )
-                    html_snapshot = _get_result_html(result)
-                    if html_snapshot and _looks_like_gateway_timeout(html_snapshot):
-                        raise RuntimeError("Gateway timeout detected; retrying.")
                     break
                 except Exception as exc:
                     last_error = exc
@@ -1086,55 +1390,82 @@ async def _crawl_page_visual(
                     raise
             if result is None and last_error is not None:
                 raise last_error
+            # 截图 / PDF 可达数十 MB，解码与写盘放到线程里，不阻塞同一事件循环上的其他抓取
             png_saved = None
             if capture_screenshot:
-                png_saved = _save_capture_result(
-                    result, output_path=png_path, candidates=_CAPTURE_PNG_ATTRS
+                png_saved = await asyncio.to_thread(
+                    _save_capture_result,
+                    result,
+                    output_path=png_path,
+                    candidates=_CAPTURE_PNG_ATTRS,
                 )
             pdf_saved = None
             if capture_pdf and pdf_path:
-                pdf_saved = _save_capture_result(
-                    result, output_path=pdf_path, candidates=_CAPTURE_PDF_ATTRS
+                pdf_saved = await asyncio.to_thread(
+                    _save_capture_result,
+                    result,
+                    output_path=pdf_path,
+                    candidates=_CAPTURE_PDF_ATTRS,
                 )
                 if not pdf_saved:
                     pdf_bytes = getattr(result, "pdf", None)
                     if isinstance(pdf_bytes, (bytes, bytearray)) and pdf_bytes:
-                        pdf_path.write_bytes(bytes(pdf_bytes))
+                        # write_bytes 接受 bytearray，无需先复制成 bytes
+                        await asyncio.to_thread(pdf_path.write_bytes, pdf_bytes)
                         pdf_saved = pdf_path
             return png_saved, pdf_saved
 
         if print_scale is not None and capture_pdf:
-            png_saved, _ = await run_capture(
-                css_selector,
-                wait_for_selector,
-                capture_screenshot=True,
-                capture_pdf=False,
-                print_scale_override=None,
-            )
-            if not png_saved:
+
+            async def capture_png() -> Path | None:
                 png_saved, _ = await run_capture(
-                    None,
-                    "body",
+                    css_selector,
+                    wait_for_selector,
                     capture_screenshot=True,
                     capture_pdf=False,
                     print_scale_override=None,
                 )
+                if not png_saved:
+                    png_saved, _ = await run_capture(
+                        None,
+                        "body",
+                        capture_screenshot=True,
+                        capture_pdf=False,
+                        print_scale_override=None,
+                    )
+                return png_saved
 
-            _, pdf_saved = await run_capture(
-                css_selector,
-                wait_for_selector,
-                capture_screenshot=False,
-                capture_pdf=True,
-                print_scale_override=print_scale,
-            )
-            if not pdf_saved:
+            async def capture_scaled_pdf(session: str | None = None) -> Path | None:
                 _, pdf_saved = await run_capture(
-                    None,
-                    "body",
+                    css_selector,
+                    wait_for_selector,
                     capture_screenshot=False,
                     capture_pdf=True,
                     print_scale_override=print_scale,
+                    session=session,
                 )
+                if not pdf_saved:
+                    _, pdf_saved = await run_capture(
+                        None,
+                        "body",
+                        capture_screenshot=False,
+                        capture_pdf=True,
+                        print_scale_override=print_scale,
+                        session=session,
+                    )
+                return pdf_saved
+
+            if preload_url:
+                # 预热过的会话只有一个页面，两次导出只能依次进行
+                png_saved = await capture_png()
+                pdf_saved = await capture_scaled_pdf()
+            else:
+                # 无需预热时 PDF 用独立页面与截图并行导出
+                pdf_session = f"{session_id}-pdf"
+                async with _scoped_session(crawler, pdf_session):
+                    png_saved, pdf_saved = await asyncio.gather(
+                        capture_png(), capture_scaled_pdf(pdf_session)
+                    )
         else:
             png_saved, pdf_saved = await run_capture(
                 css_selector,
@@ -1153,7 +1484,10 @@ async def _crawl_page_visual(
                 )
 
     if capture_pdf and png_saved and pdf_from_png and pdf_path:
-        pdf_saved = _write_pdf_from_png(png_saved, pdf_path) or pdf_saved
+        pdf_saved = (
+            await asyncio.to_thread(_write_pdf_from_png, png_saved, pdf_path)
+            or pdf_saved
+        )
 
     if not png_saved and not pdf_saved:
         raise RuntimeError("Crawl did not return screenshot or pdf output.")
@@ -1165,6 +1499,74 @@ async def _crawl_page_visual(
     }
 
 
+# 不影响抓取结果的参数不进入缓存键；指定了输出目录 / 工作区时调用方需要落盘文件，不走缓存
+_UNCACHED_ARGS = frozenset({"crawler", "timeout_s"})
+_FILE_OUTPUT_ARGS = ("output_dir", "workspace", "keep_files")
+
+
+def _cached_page(func):
+    """按 URL 与抓取参数缓存页面内容，复用 wiki API 抓取的本地缓存与 TTL。"""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        options = {
+            name: value
+            for name, value in bound.arguments.items()
+            if name not in _UNCACHED_ARGS
+        }
+        if any(options.pop(name, None) for name in _FILE_OUTPUT_ARGS):
+            return await func(*args, **kwargs)
+        key = page_cache_key(func.__name__, options.pop("url"), options)
+        # sqlite 读写可能要等其他线程持有的连接锁，放到工作线程里做，不阻塞事件循环
+        cached = await asyncio.to_thread(load_cached_markdown, key)
+        if cached is not None:
+            return cached
+
+        async def fetch() -> str:
+            content = await func(*args, **kwargs)
+            await asyncio.to_thread(store_cached_markdown, key, content)
+            return content
+
+        return await _singleflight(key, fetch)
+
+    return wrapper
+
+
+# 正在进行的相同抓取：键 -> (共享任务, 等待者数)
+_in_flight: dict[str, tuple[asyncio.Task[str], int]] = {}
+
+
+async def _singleflight(key: str, fetch: Callable[[], Awaitable[str]]) -> str:
+    """相同键的并发调用共享同一次抓取；全部等待者取消后才取消抓取本身。"""
+    entry = _in_flight.get(key)
+    if entry is None or entry[0].get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(fetch())
+        task.add_done_callback(
+            lambda done: _in_flight.pop(key, None)
+            if _in_flight.get(key, (None,))[0] is done
+            else None
+        )
+        waiters = 0
+    else:
+        task, waiters = entry
+    _in_flight[key] = (task, waiters + 1)
+    try:
+        return await asyncio.shield(task)
+    finally:
+        current = _in_flight.get(key)
+        if current is not None and current[0] is task:
+            remaining = current[1] - 1
+            if remaining > 0:
+                _in_flight[key] = (task, remaining)
+            else:
+                _in_flight.pop(key, None)
+                task.cancel()
+
+
+@_cached_page
 async def crawl_page(
     url: str,
     *,
@@ -1172,9 +1574,10 @@ async def crawl_page(
     timeout_s: float | None = None,
     css_selector: str | None = None,
     structured: bool = False,
+    crawler: AsyncWebCrawler | None = None,
 ) -> str:
     return await _run_with_timeout(
-        _crawl_with_config(
+        lambda: _crawl_with_config(
             url,
             target_url=None,
             source_url=None,
@@ -1189,16 +1592,81 @@ async def crawl_page(
             prefer_fit_markdown=False,
             prefer_extracted_content=False,
             timeout_s=timeout_s,
+            crawler=crawler,
         ),
         timeout_s,
+        slot="crawl",
     )
 
 
+async def crawl_multi(
+    urls: list[str],
+    fn: Callable[[str], Awaitable[str]],
+    *,
+    concurrency: int | None = None,
+) -> AsyncIterator[tuple[str, str]]:
+    """并发执行 fn(url)，按完成顺序产出 (url, content)；失败的 URL 记录警告后跳过。"""
+    unique_urls = list(dict.fromkeys(url for url in urls if url))
+    semaphore = asyncio.Semaphore(max(1, concurrency or config.crawler_concurrency))
+
+    async def _crawl_one(url: str) -> tuple[str, str | Exception]:
+        async with semaphore:
+            try:
+                return url, await fn(url)
+            except Exception as exc:
+                return url, exc
+
+    tasks = [asyncio.create_task(_crawl_one(url)) for url in unique_urls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            url, result = await next_done
+            if isinstance(result, Exception):
+                logger.warning("crawl failed for %s: %s", url, result)
+                continue
+            yield url, result
+    finally:
+        # 调用方提前结束迭代时取消尚未完成的抓取
+        for task in tasks:
+            task.cancel()
+
+
+async def crawl_many(
+    urls: list[str],
+    *,
+    concurrency: int | None = None,
+    use_proxy: bool = False,
+    timeout_s: float | None = None,
+    css_selector: str | None = None,
+    structured: bool = False,
+    headless: bool = True,
+) -> dict[str, str]:
+    """共享一个浏览器并发抓取多个页面，失败的 URL 不出现在结果中。"""
+    browser_cfg = build_browser_config(headless=headless)
+    async with _open_crawler(browser_cfg, None, verbose=False) as crawler:
+        crawl_one = functools.partial(
+            crawl_page,
+            use_proxy=use_proxy,
+            timeout_s=timeout_s,
+            css_selector=css_selector,
+            structured=structured,
+            crawler=crawler,
+        )
+        async with contextlib.aclosing(
+            crawl_multi(urls, crawl_one, concurrency=concurrency)
+        ) as results:
+            return {url: content async for url, content in results}
+
+
+@_cached_page
 async def crawl_biligame_page(
-    url: str, *, use_proxy: bool = False, timeout_s: float | None = None
+    url: str,
+    *,
+    use_proxy: bool = False,
+    timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> str:
     return await _run_with_timeout(
-        _crawl_with_config(
+        lambda: _crawl_with_config(
             url,
             target_url=None,
             source_url=None,
@@ -1213,17 +1681,24 @@ async def crawl_biligame_page(
             prefer_fit_markdown=False,
             prefer_extracted_content=False,
             timeout_s=timeout_s,
+            crawler=crawler,
         ),
         timeout_s,
+        slot="crawl",
     )
 
 
+@_cached_page
 async def crawl_moegirl_page(
-    url: str, *, use_proxy: bool = True, timeout_s: float | None = None
+    url: str,
+    *,
+    use_proxy: bool = True,
+    timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> str:
     render_url = _build_moegirl_render_url(url) or url
     return await _run_with_timeout(
-        _crawl_with_config(
+        lambda: _crawl_with_config(
             url,
             target_url=render_url,
             source_url=url,
@@ -1238,16 +1713,23 @@ async def crawl_moegirl_page(
             prefer_fit_markdown=False,
             prefer_extracted_content=False,
             timeout_s=timeout_s,
+            crawler=crawler,
         ),
         timeout_s,
+        slot="crawl",
     )
 
 
+@_cached_page
 async def crawl_biligame_page_pruned(
-    url: str, *, use_proxy: bool = False, timeout_s: float | None = None
+    url: str,
+    *,
+    use_proxy: bool = False,
+    timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> str:
     return await _run_with_timeout(
-        _crawl_with_config(
+        lambda: _crawl_with_config(
             url,
             target_url=None,
             source_url=None,
@@ -1262,17 +1744,24 @@ async def crawl_biligame_page_pruned(
             prefer_fit_markdown=True,
             prefer_extracted_content=False,
             timeout_s=timeout_s,
+            crawler=crawler,
         ),
         timeout_s,
+        slot="crawl",
     )
 
 
+@_cached_page
 async def crawl_moegirl_page_pruned(
-    url: str, *, use_proxy: bool = True, timeout_s: float | None = None
+    url: str,
+    *,
+    use_proxy: bool = True,
+    timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> str:
     render_url = _build_moegirl_render_url(url) or url
     return await _run_with_timeout(
-        _crawl_with_config(
+        lambda: _crawl_with_config(
             url,
             target_url=render_url,
             source_url=url,
@@ -1287,8 +1776,10 @@ async def crawl_moegirl_page_pruned(
             prefer_fit_markdown=True,
             prefer_extracted_content=False,
             timeout_s=timeout_s,
+            crawler=crawler,
         ),
         timeout_s,
+        slot="crawl",
     )
 
 
@@ -1308,6 +1799,7 @@ async def crawl_biligame_page_visual(
     pdf_from_png: bool = False,
     print_scale: float | None = None,
     timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> dict[str, str]:
     output_dir, _ = _resolve_output_dir(
         output_dir,
@@ -1316,7 +1808,7 @@ async def crawl_biligame_page_visual(
         require_output_dir=True,
     )
     return await _run_with_timeout(
-        _crawl_page_visual(
+        lambda: _crawl_page_visual(
             url,
             target_url=None,
             source_url=None,
@@ -1335,8 +1827,10 @@ async def crawl_biligame_page_visual(
             pdf_from_png=pdf_from_png,
             print_scale=print_scale,
             timeout_s=timeout_s,
+            crawler=crawler,
         ),
         timeout_s,
+        slot="visual",
     )
 
 
@@ -1352,6 +1846,7 @@ async def crawl_moegirl_page_visual(
     pdf_from_png: bool = False,
     print_scale: float | None = None,
     timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> dict[str, str]:
     output_dir, _ = _resolve_output_dir(
         output_dir,
@@ -1359,9 +1854,8 @@ async def crawl_moegirl_page_visual(
         keep_files=keep_files,
         require_output_dir=True,
     )
-    session_id = f"visual-{_slug_from_url(url)}"
     return await _run_with_timeout(
-        _crawl_page_visual(
+        lambda: _crawl_page_visual(
             url,
             target_url=None,
             source_url=url,
@@ -1378,16 +1872,18 @@ async def crawl_moegirl_page_visual(
             preload_delay_s=2.0,
             wait_until="commit",
             page_timeout_ms=60000,
-            session_id=session_id,
             headless=headless,
             pdf_from_png=pdf_from_png,
             print_scale=print_scale,
             timeout_s=timeout_s,
+            crawler=crawler,
         ),
         timeout_s,
+        slot="visual",
     )
 
 
+@_cached_page
 async def crawl_moegirl_page_visual_markitdown(
     url: str,
     *,
@@ -1399,6 +1895,7 @@ async def crawl_moegirl_page_visual_markitdown(
     print_scale: float | None = None,
     headless: bool = False,
     timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> str:
     async def _run() -> str:
         proxy_flag = bool(config.proxy_url()) if use_proxy is None else use_proxy
@@ -1422,6 +1919,7 @@ async def crawl_moegirl_page_visual_markitdown(
                 print_scale=print_scale_value,
                 headless=headless_flag,
                 timeout_s=timeout_s,
+                crawler=crawler,
             )
             if capture_pdf:
                 target_path = capture.get("pdf_path", "")
@@ -1435,9 +1933,7 @@ async def crawl_moegirl_page_visual_markitdown(
                 target_path = _choose_capture_path(capture)
                 if not target_path:
                     return ""
-            from umamusume_web_crawler.web.process import convert_markitdown
-
-            return convert_markitdown(target_path)
+            return await convert_markitdown_async(target_path)
 
         try:
             content = await _capture_and_convert(headless)
@@ -1462,9 +1958,10 @@ async def crawl_moegirl_page_visual_markitdown(
             if temp_workspace is not None:
                 temp_workspace.cleanup()
 
-    return await _run_with_timeout(_run(), timeout_s)
+    return await _run_with_timeout(_run, timeout_s, slot="visual")
 
 
+@_cached_page
 async def crawl_page_visual_markitdown(
     url: str,
     *,
@@ -1474,6 +1971,7 @@ async def crawl_page_visual_markitdown(
     keep_files: bool = False,
     capture_pdf: bool = True,
     timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> str:
     async def _run() -> str:
         proxy_flag = bool(config.proxy_url()) if use_proxy is None else use_proxy
@@ -1498,6 +1996,7 @@ async def crawl_page_visual_markitdown(
             wait_for_images=None,
             print_scale=None,
             timeout_s=timeout_s,
+            crawler=crawler,
         )
         if capture_pdf:
             target_path = capture.get("pdf_path", "")
@@ -1507,17 +2006,16 @@ async def crawl_page_visual_markitdown(
             target_path = _choose_capture_path(capture)
             if not target_path:
                 return ""
-        from umamusume_web_crawler.web.process import convert_markitdown
-
         try:
-            return convert_markitdown(target_path)
+            return await convert_markitdown_async(target_path)
         finally:
             if temp_workspace is not None:
                 temp_workspace.cleanup()
 
-    return await _run_with_timeout(_run(), timeout_s)
+    return await _run_with_timeout(_run, timeout_s, slot="visual")
 
 
+@_cached_page
 async def crawl_biligame_page_visual_markitdown(
     url: str,
     *,
@@ -1527,6 +2025,7 @@ async def crawl_biligame_page_visual_markitdown(
     keep_files: bool = False,
     capture_pdf: bool = True,
     timeout_s: float | None = None,
+    crawler: AsyncWebCrawler | None = None,
 ) -> str:
     async def _run() -> str:
         proxy_flag = bool(config.proxy_url()) if use_proxy is None else use_proxy
@@ -1542,6 +2041,7 @@ async def crawl_biligame_page_visual_markitdown(
             output_dir=resolved_output_dir,
             capture_pdf=capture_pdf,
             timeout_s=timeout_s,
+            crawler=crawler,
         )
         if capture_pdf:
             target_path = capture.get("pdf_path", "")
@@ -1551,12 +2051,10 @@ async def crawl_biligame_page_visual_markitdown(
             target_path = _choose_capture_path(capture)
             if not target_path:
                 return ""
-        from umamusume_web_crawler.web.process import convert_markitdown
-
         try:
-            return convert_markitdown(target_path)
+            return await convert_markitdown_async(target_path)
         finally:
             if temp_workspace is not None:
                 temp_workspace.cleanup()
 
-    return await _run_with_timeout(_run(), timeout_s)
+    return await _run_with_timeout(_run, timeout_s, slot="visual")
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+from collections.abc import AsyncIterator
+
+import aiohttp
+
+from umamusume_web_crawler.config import config
+from umamusume_web_crawler.web.cache import (
+    load_http_cache,
+    store_http_body,
+    store_http_validators,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+try:
+    import brotli  # noqa: F401
+except ImportError:  # pragma: no cover - aiohttp only decodes br with brotli
+    _ACCEPT_ENCODING = "gzip, deflate"
+else:
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+
+
+# 展开后的 wikitext 可达数 MB，默认 64KB 读缓冲会频繁触发背压
+READ_BUFSIZE = 4 * 1024 * 1024
+
+_session: aiohttp.ClientSession | None = None
+_session_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _build_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=100,
+        limit_per_host=10,
+        use_dns_cache=True,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True,
+    )
+    headers = {
+        "User-Agent": config.user_agent,
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        "Accept-Encoding": _ACCEPT_ENCODING,
+    }
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=headers,
+        read_bufsize=READ_BUFSIZE,
+        auto_decompress=True,
+    )
+
+
+def get_session() -> aiohttp.ClientSession:
+    """返回当前事件循环共享的 ClientSession，首次调用时创建。"""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        # 每个 asyncio.run 都是新的事件循环，旧 session 不能跨循环复用
+        _session = _build_session()
+        _session_loop = loop
+    return _session
+
+
+async def close_session() -> None:
+    global _session, _session_loop
+    session = _session
+    _session = None
+    _session_loop = None
+    if session is not None and not session.closed:
+        await session.close()
+
+
+async def prewarm(hosts: list[str], port: int = 443) -> None:
+    """并发预解析 DNS，解析失败不影响启动。"""
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(loop.getaddrinfo(host, port) for host in hosts),
+        return_exceptions=True,
+    )
+
+
+@contextlib.asynccontextmanager
+async def http_session() -> AsyncIterator[aiohttp.ClientSession]:
+    try:
+        yield get_session()
+    finally:
+        await close_session()
+
+
+def json_loads(payload: bytes) -> object:
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload.decode("utf-8"))
+
+
+def json_dumps(payload: object) -> str:
+    """与 json.dumps(ensure_ascii=False, indent=2) 输出一致的序列化。"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except orjson.JSONEncodeError:
+            # 孤立代理字符、超大整数等 orjson 不支持的值交给标准库
+            pass
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+def request_proxy(use_proxy: bool | None) -> str | None:
+    if use_proxy is False:
+        return None
+    return config.proxy_url()
+
+
+async def request_json(
+    url: str,
+    *,
+    timeout_s: float,
+    use_proxy: bool | None = None,
+    session: aiohttp.ClientSession | None = None,
+    cache: bool = True,
+) -> object:
+    """GET 并解析 JSON；cache=False 时不读写磁盘缓存（如关键字各异的搜索请求）。"""
+    client = session or get_session()
+    cached = None
+    if cache:
+        # sqlite 读写放到线程里，避免磁盘 I/O 阻塞事件循环、串行化 gather 出去的请求
+        cached, fresh = await asyncio.to_thread(load_http_cache, url)
+        if fresh is not None:
+            return json_loads(fresh)
+    headers: dict[str, str] = {}
+    if cached is not None:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    async with client.get(
+        url,
+        headers=headers,
+        proxy=request_proxy(use_proxy),
+        timeout=aiohttp.ClientTimeout(total=timeout_s),
+    ) as resp:
+        if resp.status == 304 and cached is not None:
+            return json_loads(cached[2])
+        resp.raise_for_status()
+        payload = await resp.read()
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+    data = json_loads(payload)
+    if not cache:
+        return data
+    if etag or last_modified:
+        # 服务端给了校验字段时落盘，下次可用 304 省掉响应体传输
+        await asyncio.to_thread(
+            store_http_validators,
+            url,
+            etag=etag,
+            last_modified=last_modified,
+            body=payload,
+        )
+    elif not (isinstance(data, dict) and "error" in data):
+        # MediaWiki API 一般不带校验字段，按 TTL 缓存；API 报错（如限流）不缓存
+        await asyncio.to_thread(store_http_body, url, payload)
+    return data
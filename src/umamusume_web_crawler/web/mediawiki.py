@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from collections.abc import Awaitable, Callable
+from typing import Any, Dict
+
+from umamusume_web_crawler.config import config
+
+
+# biligame / umamusu.wiki / 萌娘百科都是 MediaWiki，批量取 wikitext 与嵌入页展开共用这里的实现
+MAX_TITLES_PER_QUERY = 50
+_TRANSCLUSION_PATTERN = re.compile(r"\{\{:\s*([^}|]+)")
+
+# 站点各自的请求函数：查询参数 -> 解析后的 JSON
+QueryFunc = Callable[[Dict[str, str]], Awaitable[object]]
+
+
+def extract_wikitext_from_page(page: Dict[str, Any]) -> str:
+    revisions = page.get("revisions") or []
+    if not revisions:
+        return ""
+    revision = revisions[0]
+    if isinstance(revision, dict):
+        if "slots" in revision:
+            slots = revision.get("slots") or {}
+            main = slots.get("main") or {}
+            return str(main.get("*") or main.get("content") or "")
+        return str(revision.get("*") or revision.get("content") or "")
+    return ""
+
+
+def extract_wikitexts(payload: Dict[str, Any], titles: list[str]) -> dict[str, str]:
+    query = payload.get("query", {})
+    normalized = {
+        str(item.get("from")): str(item.get("to"))
+        for item in query.get("normalized") or []
+        if isinstance(item, dict)
+    }
+    pages = query.get("pages")
+    if isinstance(pages, dict):
+        pages = list(pages.values())
+    if not isinstance(pages, list):
+        return {}
+    by_title = {
+        str(page.get("title")): extract_wikitext_from_page(page)
+        for page in pages
+        if isinstance(page, dict)
+    }
+    contents: dict[str, str] = {}
+    for title in titles:
+        content = by_title.get(normalized.get(title, title), "")
+        if content:
+            contents[title] = content
+    return contents
+
+
+def extract_transclusions(wikitext: str) -> list[str]:
+    # dict 保留首次出现的顺序，去重是 O(1) 查找
+    titles = dict.fromkeys(
+        match.group(1).strip() for match in _TRANSCLUSION_PATTERN.finditer(wikitext or "")
+    )
+    titles.pop("", None)
+    return list(titles)
+
+
+async def fetch_wikitexts(
+    titles: list[str], query: QueryFunc, *, concurrency: int | None = None
+) -> dict[str, str]:
+    """按 titles=A|B|C 每批 50 个并发请求并跟随 continue，没有内容的页面不出现在结果里。"""
+    unique_titles = list(dict.fromkeys(title for title in titles if title))
+    semaphore = asyncio.Semaphore(max(1, concurrency or config.crawler_concurrency))
+
+    async def _fetch_batch(batch: list[str]) -> dict[str, str]:
+        params = {
+            "action": "query",
+            "prop": "revisions",
+            "rvprop": "content",
+            "rvslots": "main",
+            "format": "json",
+            "formatversion": "2",
+            "titles": "|".join(batch),
+        }
+        contents: dict[str, str] = {}
+        while True:
+            async with semaphore:
+                payload = await query(params)
+            if not isinstance(payload, dict):
+                raise RuntimeError("MediaWiki API returned unexpected payload.")
+            for title, content in extract_wikitexts(payload, batch).items():
+                contents.setdefault(title, content)
+            # 内容超过单次返回上限时，其余页面的 revisions 要带上 rvcontinue 续取
+            continuation = payload.get("continue")
+            if not isinstance(continuation, dict) or not continuation:
+                return contents
+            next_params = {**params, **{k: str(v) for k, v in continuation.items()}}
+            if next_params == params:
+                return contents
+            params = next_params
+
+    batches = await asyncio.gather(
+        *(
+            _fetch_batch(unique_titles[index : index + MAX_TITLES_PER_QUERY])
+            for index in range(0, len(unique_titles), MAX_TITLES_PER_QUERY)
+        )
+    )
+    contents: dict[str, str] = {}
+    for batch_contents in batches:
+        contents.update(batch_contents)
+    return contents
+
+
+async def fetch_wikitext_expanded(
+    title: str,
+    *,
+    fetch_one: Callable[[str], Awaitable[str]],
+    fetch_many: Callable[[list[str]], Awaitable[dict[str, str]]],
+    max_depth: int,
+    max_pages: int,
+) -> str:
+    """把 {{:页面}} 形式的嵌入页按层展开并拼接在正文之后。
+
+    嵌入页按广度优先逐层收集，每层一次 fetch_many；max_pages 按这个顺序截断，
+    即先保留浅层的嵌入页。任一嵌入页取不到内容时抛出 RuntimeError。
+    """
+    if max_pages <= 0:
+        return ""
+    texts = {title: await fetch_one(title)}
+    children: dict[str, list[str]] = {}
+    visited = {title}
+    frontier = [title]
+    # 按层收集嵌入页，每层合并成 titles=A|B|C 的批量请求
+    for _ in range(max_depth):
+        next_frontier: list[str] = []
+        for parent in frontier:
+            kids: list[str] = []
+            for child_title in extract_transclusions(texts[parent]):
+                if len(visited) >= max_pages:
+                    break
+                if child_title in visited:
+                    continue
+                visited.add(child_title)
+                kids.append(child_title)
+            children[parent] = kids
+            next_frontier.extend(kids)
+        if not next_frontier:
+            break
+        texts.update(await fetch_many(next_frontier))
+        missing = [
+            child_title for child_title in next_frontier if not texts.get(child_title)
+        ]
+        if missing:
+            raise RuntimeError(
+                f"MediaWiki API returned empty wikitext for: {', '.join(missing)}."
+            )
+        frontier = next_frontier
+
+    def _render(page_title: str, parts: list[str]) -> None:
+        # 片段统一追加到一个列表，最后只拼接一次
+        parts.append(texts[page_title])
+        for child_title in children.get(page_title, []):
+            parts.append(f"\n\n== {child_title} ==\n")
+            _render(child_title, parts)
+
+    parts: list[str] = []
+    _render(title, parts)
+    return "".join(parts)
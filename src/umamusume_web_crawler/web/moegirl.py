@@ -1,25 +1,28 @@
 from __future__ import annotations
 
 import asyncio
-import json
-import re
 from typing import Any, Dict
 from urllib.parse import parse_qs, quote, unquote, urlparse, urlencode
-from urllib.request import ProxyHandler, Request, build_opener
 
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 
 from umamusume_web_crawler.config import config
+from umamusume_web_crawler.url_utils import HTTP_PREFIXES
+from umamusume_web_crawler.web.http_client import request_json
+from umamusume_web_crawler.web.mediawiki import fetch_wikitext_expanded
 
 
 DEFAULT_API_ENDPOINT = "https://zh.moegirl.org.cn/api.php"
-_TRANSCLUSION_PATTERN = re.compile(r"\{\{:\s*([^}|]+)")
+# 与 BeautifulSoup.get_text 一致：不含注释以及 script / style / template 内的文字
+_VISIBLE_TEXT_XPATH = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+)
 
 
 def _normalize_title(value: str) -> str:
     if not value:
         return ""
-    if value.startswith("http://") or value.startswith("https://"):
+    if value.startswith(HTTP_PREFIXES):
         parsed = urlparse(value)
         if parsed.path.endswith("/index.php"):
             params = parse_qs(parsed.query)
@@ -35,28 +38,12 @@ def _build_api_url(endpoint: str, params: Dict[str, str]) -> str:
     return f"{endpoint}?{query}"
 
 
-def _build_opener(use_proxy: bool | None) -> object:
-    if use_proxy is False:
-        return build_opener(ProxyHandler({}))
-    proxy_url = config.proxy_url()
-    if not proxy_url:
-        return build_opener()
-    proxy_handler = ProxyHandler({"http": proxy_url, "https": proxy_url})
-    return build_opener(proxy_handler)
-
-
-def _request_json(
-    url: str, *, timeout_s: float, use_proxy: bool | None = None
+async def _request_json(
+    url: str, *, timeout_s: float, use_proxy: bool | None = None, cache: bool = True
 ) -> Dict[str, Any]:
-    headers = {
-        "User-Agent": config.user_agent,
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-    }
-    req = Request(url, headers=headers)
-    opener = _build_opener(use_proxy)
-    with opener.open(req, timeout=timeout_s) as resp:
-        payload = resp.read()
-    return json.loads(payload.decode("utf-8"))
+    return await request_json(
+        url, timeout_s=timeout_s, use_proxy=use_proxy, cache=cache
+    )
 
 
 def _extract_page(payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -95,15 +82,6 @@ def _extract_parse_html(payload: Dict[str, Any]) -> str:
     return ""
 
 
-def _extract_transclusions(wikitext: str) -> list[str]:
-    titles: list[str] = []
-    for match in _TRANSCLUSION_PATTERN.finditer(wikitext or ""):
-        title = match.group(1).strip()
-        if title and title not in titles:
-            titles.append(title)
-    return titles
-
-
 async def fetch_moegirl_wikitext(
     title_or_url: str,
     *,
@@ -123,8 +101,8 @@ async def fetch_moegirl_wikitext(
         "titles": title,
     }
     extract_url = _build_api_url(endpoint, extract_params)
-    extract_payload = await asyncio.to_thread(
-        _request_json, extract_url, timeout_s=timeout_s, use_proxy=use_proxy
+    extract_payload = await _request_json(
+        extract_url, timeout_s=timeout_s, use_proxy=use_proxy
     )
     extract_page = _extract_page(extract_payload)
     extract_text = _extract_plaintext_from_page(extract_page)
@@ -138,6 +116,32 @@ async def fetch_moegirl_wikitext(
     raise RuntimeError("Moegirl API returned empty content.")
 
 
+async def fetch_moegirl_wikitexts(
+    titles: list[str],
+    *,
+    endpoint: str = DEFAULT_API_ENDPOINT,
+    timeout_s: float = 30.0,
+    use_proxy: bool | None = None,
+    concurrency: int | None = None,
+) -> dict[str, str]:
+    """并发抓取多个页面的纯文本，没有内容的页面不出现在结果里。"""
+    # TextExtracts 只有 exintro 时才能一次返回多页全文，这里逐页请求并限制并发
+    unique_titles = list(dict.fromkeys(title for title in titles if title))
+    semaphore = asyncio.Semaphore(max(1, concurrency or config.crawler_concurrency))
+
+    async def _fetch(title: str) -> str | None:
+        async with semaphore:
+            try:
+                return await fetch_moegirl_wikitext(
+                    title, endpoint=endpoint, timeout_s=timeout_s, use_proxy=use_proxy
+                )
+            except RuntimeError:
+                return None
+
+    texts = await asyncio.gather(*(_fetch(title) for title in unique_titles))
+    return {title: text for title, text in zip(unique_titles, texts) if text}
+
+
 async def fetch_moegirl_wikitext_expanded(
     title_or_url: str,
     *,
@@ -146,36 +150,26 @@ async def fetch_moegirl_wikitext_expanded(
     max_depth: int = 1,
     max_pages: int = 5,
     use_proxy: bool | None = None,
+    concurrency: int | None = None,
 ) -> str:
-    visited: set[str] = set()
-
-    async def _fetch(title: str, depth: int) -> str:
-        if not title or title in visited or len(visited) >= max_pages:
-            return ""
-        visited.add(title)
-        text = await fetch_moegirl_wikitext(
-            title, endpoint=endpoint, timeout_s=timeout_s, use_proxy=use_proxy
-        )
-        if depth <= 0:
-            return text
-        transclusions = _extract_transclusions(text)
-        if not transclusions:
-            return text
-        appended: list[str] = []
-        for child_title in transclusions:
-            if len(visited) >= max_pages:
-                break
-            child_text = await _fetch(child_title, depth - 1)
-            if child_text:
-                appended.append(f"\n\n== {child_title} ==\n{child_text}")
-        if appended:
-            return text + "".join(appended)
-        return text
-
     title = _normalize_title(title_or_url)
     if not title:
         raise ValueError("Missing moegirl page title.")
-    return await _fetch(title, max_depth)
+    return await fetch_wikitext_expanded(
+        title,
+        fetch_one=lambda page_title: fetch_moegirl_wikitext(
+            page_title, endpoint=endpoint, timeout_s=timeout_s, use_proxy=use_proxy
+        ),
+        fetch_many=lambda titles: fetch_moegirl_wikitexts(
+            titles,
+            endpoint=endpoint,
+            timeout_s=timeout_s,
+            use_proxy=use_proxy,
+            concurrency=concurrency,
+        ),
+        max_depth=max_depth,
+        max_pages=max_pages,
+    )
 
 
 async def search_moegirl_titles(
@@ -195,8 +189,9 @@ async def search_moegirl_titles(
         "format": "json",
     }
     url = _build_api_url(endpoint, params)
-    payload = await asyncio.to_thread(
-        _request_json, url, timeout_s=timeout_s, use_proxy=use_proxy
+    # 搜索关键字千差万别，缓存命中率低，不写入磁盘缓存
+    payload = await _request_json(
+        url, timeout_s=timeout_s, use_proxy=use_proxy, cache=False
     )
     if isinstance(payload, list) and len(payload) > 1 and isinstance(payload[1], list):
         return [str(title) for title in payload[1] if title]
@@ -221,9 +216,7 @@ async def fetch_moegirl_html(
         "page": title,
     }
     url = _build_api_url(endpoint, params)
-    payload = await asyncio.to_thread(
-        _request_json, url, timeout_s=timeout_s, use_proxy=use_proxy
-    )
+    payload = await _request_json(url, timeout_s=timeout_s, use_proxy=use_proxy)
     html = _extract_parse_html(payload)
     if not html:
         raise RuntimeError("Moegirl API returned empty HTML.")
@@ -240,8 +233,13 @@ async def fetch_moegirl_text(
     html = await fetch_moegirl_html(
         title_or_url, endpoint=endpoint, timeout_s=timeout_s, use_proxy=use_proxy
     )
-    soup = BeautifulSoup(html, "lxml")
-    main = soup.select_one(".mw-parser-output") or soup.body
-    if not main:
+    try:
+        root = lxml_html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return ""
+    found = root.find_class("mw-parser-output")
+    main = found[0] if found else root.find("body")
+    if main is None:
         return ""
-    return main.get_text("\n", strip=True)
+    texts = (text.strip() for text in _VISIBLE_TEXT_XPATH(main))
+    return "\n".join(text for text in texts if text)
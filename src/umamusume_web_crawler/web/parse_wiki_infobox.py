@@ -1,11 +1,33 @@
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
 import re
+import threading
+from collections import OrderedDict
 from typing import Dict, Tuple
 
 _INFOBOX_MARKERS = ("角色信息", "infobox")
 _SECTION_PATTERN = re.compile(r"^(={2,})\s*(.+?)\s*\1\s*$")
+_BRACE_PATTERN = re.compile(r"\{\{|\}\}")
+_TEMPLATE_PATTERN = re.compile(r"\{\{(.*?)\}\}")
+_TRANSCLUSION_PATTERN = re.compile(r"\{\{:\s*([^}|]+)")
+_WIKILINK_PATTERN = re.compile(r"\[\[(?:[^|\]]*\|)?([^\]]+)\]\]")
+_BOLD_ITALIC_PATTERN = re.compile(r"'{2,5}(.*?)'{2,5}")
+_BR_PATTERN = re.compile(r"<(br|BR|Br)\s*/?>")
+_HTML_TAG_PATTERN = re.compile(r"<.*?>")
+_REF_PATTERN = re.compile(r"<ref[^>]*>(.*?)</ref>", re.DOTALL)
+_REF_SELF_CLOSING_PATTERN = re.compile(r"<ref[^>]*/>")
+_LAYOUT_TAG_PATTERN = re.compile(
+    r"</?(div|span|center|font|big|small|table|tr|td|th)[^>]*>"
+)
+_HEADING_PATTERN = re.compile(r"^(=+)\s*(.*?)\s*\1$", re.MULTILINE)
+_CLEAN_VALUE_CACHE_MAX_LEN = 4096
+_LLM_MARKDOWN_CACHE_SIZE = 64
+_llm_markdown_cache: OrderedDict[tuple[str, str | None, bytes], str] = OrderedDict()
+# MCP 工具在 worker 线程里渲染，缓存读写需要加锁
+_llm_markdown_cache_lock = threading.Lock()
 
 
 def _clean_template(content: str, *, site: str | None) -> str:
@@ -47,15 +69,27 @@ def clean_wiki_value(text: str, *, site: str | None = None) -> str:
     """温和清洗 Wiki 文本，尽量保留内容。"""
     if not text:
         return ""
-    text = re.sub(r"\[\[(?:[^|\]]*\|)?([^\]]+)\]\]", r"\1", text)
-    text = re.sub(r"'{2,5}(.*?)'{2,5}", r"\1", text)
-    text = re.sub(r"<(br|BR|Br)\s*/?>", "\n", text)
+    # 信息框字段值短且在角色页之间大量重复，结果可缓存；长段落不占缓存
+    if len(text) <= _CLEAN_VALUE_CACHE_MAX_LEN:
+        return _clean_wiki_value_cached(text, site)
+    return _clean_wiki_value(text, site)
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_wiki_value_cached(text: str, site: str | None) -> str:
+    return _clean_wiki_value(text, site)
+
+
+def _clean_wiki_value(text: str, site: str | None) -> str:
+    text = _WIKILINK_PATTERN.sub(r"\1", text)
+    text = _BOLD_ITALIC_PATTERN.sub(r"\1", text)
+    text = _BR_PATTERN.sub("\n", text)
 
     def replace_template(match: re.Match[str]) -> str:
         return _clean_template(match.group(1), site=site)
 
-    text = re.sub(r"\{\{(.*?)\}\}", replace_template, text)
-    text = re.sub(r"<.*?>", "", text)
+    text = _TEMPLATE_PATTERN.sub(replace_template, text)
+    text = _HTML_TAG_PATTERN.sub("", text)
     return text.strip()
 
 
@@ -64,13 +98,16 @@ def clean_wikitext_for_llm(text: str, *, site: str | None = None) -> str:
     if not text:
         return ""
 
-    text = re.sub(r"\[\[(?:[^|\]]*\|)?([^\]]+)\]\]", r"[\1]", text)
-    text = re.sub(r"<ref[^>]*>(.*?)</ref>", r" (\1) ", text, flags=re.DOTALL)
-    text = re.sub(r"<ref[^>]*/>", "", text)
-    text = re.sub(r"<(br|BR|Br)\s*/?>", "\n", text)
-    text = re.sub(
-        r"</?(div|span|center|font|big|small|table|tr|td|th)[^>]*>", " ", text
-    )
+    # 各步顺序会影响结果（如 ref 内的链接、链接内的 <br>），不合并成一个正则；
+    # 只在文本里没有相应起始符号时跳过整遍扫描
+    if "[[" in text:
+        text = _WIKILINK_PATTERN.sub(r"[\1]", text)
+    if "<" in text:
+        if "<ref" in text:
+            text = _REF_PATTERN.sub(r" (\1) ", text)
+            text = _REF_SELF_CLOSING_PATTERN.sub("", text)
+        text = _BR_PATTERN.sub("\n", text)
+        text = _LAYOUT_TAG_PATTERN.sub(" ", text)
 
     def replace_template(match: re.Match[str]) -> str:
         content = match.group(1).strip()
@@ -79,14 +116,17 @@ def clean_wikitext_for_llm(text: str, *, site: str | None = None) -> str:
         return _clean_template(content, site=site)
 
     for _ in range(3):
-        text = re.sub(r"\{\{(.*?)\}\}", replace_template, text)
+        # 某一遍没有替换时文本不再变化，后续几遍可以省掉
+        text, replaced = _TEMPLATE_PATTERN.subn(replace_template, text)
+        if not replaced:
+            break
 
     def heading_replace(match: re.Match[str]) -> str:
         level = len(match.group(1))
         title = match.group(2).strip()
         return f"{'#' * level} {title}"
 
-    text = re.sub(r"^(=+)\s*(.*?)\s*\1$", heading_replace, text, flags=re.MULTILINE)
+    text = _HEADING_PATTERN.sub(heading_replace, text)
 
     lines: list[str] = []
     for line in text.splitlines():
@@ -109,26 +149,33 @@ def clean_wikitext_for_llm(text: str, *, site: str | None = None) -> str:
 def _extract_infobox_block(wikitext: str) -> Tuple[str, int, int]:
     if not wikitext:
         return "", -1, -1
-    for match in re.finditer(r"\{\{", wikitext):
-        start = match.start()
-        preview = wikitext[start : start + 120].lower()
-        if not any(marker in preview for marker in _INFOBOX_MARKERS):
+    # 单遍扫描 {{ / }} 并用栈配对；取起点最靠前、且能闭合的含标记模板。
+    # 未闭合的候选不会让后续候选从头重扫，避免残缺页面上的平方级开销
+    stack: list[tuple[int, bool]] = []
+    open_candidates = 0
+    best: tuple[int, int] | None = None
+    for brace in _BRACE_PATTERN.finditer(wikitext):
+        if brace.group() == "{{":
+            start = brace.start()
+            preview = wikitext[start : start + 120].lower()
+            is_candidate = any(marker in preview for marker in _INFOBOX_MARKERS)
+            stack.append((start, is_candidate))
+            open_candidates += is_candidate
             continue
-        depth = 0
-        i = start
-        while i < len(wikitext):
-            if wikitext.startswith("{{", i):
-                depth += 1
-                i += 2
-                continue
-            if wikitext.startswith("}}", i):
-                depth -= 1
-                i += 2
-                if depth == 0:
-                    return wikitext[start:i], start, i
-                continue
-            i += 1
-    return "", -1, -1
+        if not stack:
+            continue
+        start, is_candidate = stack.pop()
+        if not is_candidate:
+            continue
+        open_candidates -= 1
+        if best is None or start < best[0]:
+            best = (start, brace.end())
+        if not open_candidates:
+            break
+    if best is None:
+        return "", -1, -1
+    start, end = best
+    return wikitext[start:end], start, end
 
 
 def _parse_infobox_fields(infobox_raw: str, *, site: str | None) -> Dict[str, str]:
@@ -157,12 +204,12 @@ def _parse_infobox_fields(infobox_raw: str, *, site: str | None) -> Dict[str, st
 
 
 def _extract_transclusions(wikitext: str) -> list[str]:
-    titles: list[str] = []
-    for match in re.finditer(r"\{\{:\s*([^}|]+)", wikitext):
-        title = match.group(1).strip()
-        if title and title not in titles:
-            titles.append(title)
-    return titles
+    # dict 保留首次出现的顺序，去重是 O(1) 查找
+    titles = dict.fromkeys(
+        match.group(1).strip() for match in _TRANSCLUSION_PATTERN.finditer(wikitext)
+    )
+    titles.pop("", None)
+    return list(titles)
 
 
 def _split_sections(wikitext: str, *, site: str | None) -> list[dict[str, str]]:
@@ -190,6 +237,14 @@ def _split_sections(wikitext: str, *, site: str | None) -> list[dict[str, str]]:
     return sections
 
 
+def _split_infobox(wikitext: str, *, site: str | None) -> Tuple[Dict[str, str], str]:
+    infobox_raw, start, end = _extract_infobox_block(wikitext)
+    if not infobox_raw:
+        return {}, wikitext
+    infobox_data = _parse_infobox_fields(infobox_raw, site=site)
+    return infobox_data, (wikitext[:start] + wikitext[end:]).strip()
+
+
 def parse_wiki_page(
     wikitext: str, *, site: str | None = None
 ) -> Dict[str, str | Dict[str, str] | list[dict[str, str]] | list[str]]:
@@ -204,13 +259,7 @@ def parse_wiki_page(
             "transclusions": [],
         }
 
-    infobox_raw, start, end = _extract_infobox_block(wikitext)
-    remaining_text = wikitext
-    infobox_data: Dict[str, str] = {}
-    if infobox_raw:
-        infobox_data = _parse_infobox_fields(infobox_raw, site=site)
-        remaining_text = (wikitext[:start] + wikitext[end:]).strip()
-
+    infobox_data, remaining_text = _split_infobox(wikitext, site=site)
     transclusions = _extract_transclusions(remaining_text)
     sections = _split_sections(remaining_text, site=site)
     intro_text = sections[0]["content"] if sections else ""
@@ -306,6 +355,34 @@ def wiki_page_to_llm_markdown(
     return "\n".join(lines)
 
 
+def wikitext_to_llm_markdown(
+    title: str, wikitext: str, *, site: str | None = None
+) -> str:
+    """parse_wiki_page + wiki_page_to_llm_markdown，按 wikitext 摘要缓存最近结果。"""
+    digest = hashlib.blake2b(wikitext.encode("utf-8"), digest_size=16).digest()
+    key = (title, site, digest)
+    with _llm_markdown_cache_lock:
+        cached = _llm_markdown_cache.get(key)
+        if cached is not None:
+            _llm_markdown_cache.move_to_end(key)
+            return cached
+    # LLM 输出只用到 infobox/raw_wikitext/transclusions，跳过分节清洗与 raw_text 拼接
+    infobox_data, remaining_text = (
+        _split_infobox(wikitext, site=site) if wikitext else ({}, "")
+    )
+    page = {
+        "infobox": infobox_data,
+        "raw_wikitext": remaining_text,
+        "transclusions": _extract_transclusions(remaining_text),
+    }
+    markdown = wiki_page_to_llm_markdown(title, page, site=site)
+    with _llm_markdown_cache_lock:
+        _llm_markdown_cache[key] = markdown
+        if len(_llm_markdown_cache) > _LLM_MARKDOWN_CACHE_SIZE:
+            _llm_markdown_cache.popitem(last=False)
+    return markdown
+
+
 if __name__ == "__main__":
     raw_api_text_moegirl = """
 {{Umamusumetop}}
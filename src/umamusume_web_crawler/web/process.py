@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import functools
 import logging
+import os
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from markitdown import MarkItDown
 
 
 def _coerce_path(path: str | Path) -> Path:
@@ -16,18 +24,35 @@ def _suppress_pdfminer_warnings() -> None:
         logging.getLogger(name).setLevel(logging.ERROR)
 
 
-def convert_markitdown(path: str | Path) -> str:
+@functools.lru_cache(maxsize=1)
+def _markitdown() -> MarkItDown:
+    # 构造时会注册全部转换器并加载文件类型识别模型，整个进程复用一个实例
     try:
         from markitdown import MarkItDown
     except ImportError as exc:
         raise ImportError(
             "markitdown is not installed. Try: pip install 'markitdown[all]'"
         ) from exc
+    return MarkItDown(enable_plugins=False)
 
+
+def convert_markitdown(path: str | Path) -> str:
+    md = _markitdown()
     file_path = _coerce_path(path)
     if file_path.suffix.lower() == ".pdf":
         _suppress_pdfminer_warnings()
 
-    md = MarkItDown(enable_plugins=False)
     result = md.convert(str(file_path))
     return result.text_content or ""
+
+
+# PDF 转 Markdown 是 CPU 密集的同步过程，放在独立的小线程池里，既不阻塞事件循环，
+# 也不占满 asyncio.to_thread 共用的默认线程池
+_MARKITDOWN_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 2), thread_name_prefix="markitdown"
+)
+
+
+async def convert_markitdown_async(path: str | Path) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_MARKITDOWN_EXECUTOR, convert_markitdown, path)
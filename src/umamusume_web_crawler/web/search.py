@@ -4,12 +4,20 @@ from typing import Any, Dict, List, Optional
 from urllib.parse import parse_qs, unquote, urlencode, urlparse
 from urllib.request import ProxyHandler, Request, build_opener
 
-from bs4 import BeautifulSoup
+import aiohttp
 from googleapiclient.discovery import build
 from httplib2 import Http, ProxyInfo
+from lxml import etree, html as lxml_html
 
 from umamusume_web_crawler.config import config
+from umamusume_web_crawler.url_utils import HTTP_PREFIXES
+from umamusume_web_crawler.web.http_client import (
+    get_session,
+    json_loads,
+    request_proxy,
+)
 
+_CUSTOM_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
 _DEFAULT_SEARCH_UA = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -58,6 +66,43 @@ def google_search_urls(search_term: str, **kwargs: Any) -> List[Dict[str, Any]]:
     return urls
 
 
+async def google_search_async(
+    search_term: str,
+    *,
+    timeout_s: float = 10.0,
+    session: aiohttp.ClientSession | None = None,
+    **kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """直接 GET Custom Search JSON API，复用共享 session，不经过 discovery 客户端。"""
+    config.validate_web_tools()
+    params = {
+        "key": config.google_api_key,
+        "cx": config.google_cse_id,
+        "q": search_term,
+        **kwargs,
+    }
+    client = session or get_session()
+    async with client.get(
+        _CUSTOM_SEARCH_URL,
+        params=params,
+        proxy=request_proxy(None),
+        timeout=aiohttp.ClientTimeout(total=timeout_s),
+    ) as resp:
+        resp.raise_for_status()
+        payload = await resp.read()
+    res = json_loads(payload)
+    return _extract_formatted_urls(res.get("items", []))
+
+
+async def google_search_urls_async(
+    search_term: str, **kwargs: Any
+) -> List[Dict[str, Any]]:
+    urls = await google_search_async(search_term, **kwargs)
+    if not urls:
+        raise ValueError("No results found")
+    return urls
+
+
 def _google_user_agent() -> str:
     user_agent = config.user_agent or _DEFAULT_SEARCH_UA
     if user_agent == "UmamusumeWebCrawler/1.0":
@@ -74,6 +119,16 @@ def _build_proxy_handler(use_proxy: bool | None) -> ProxyHandler | None:
     return ProxyHandler({"http": proxy_url, "https": proxy_url})
 
 
+def _google_search_request(query: str, num: int) -> tuple[str, Dict[str, str]]:
+    params = {"q": query, "num": str(num), "hl": "zh-CN"}
+    url = f"https://www.google.com/search?{urlencode(params)}"
+    headers = {
+        "User-Agent": _google_user_agent(),
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    }
+    return url, headers
+
+
 def _fetch_google_search_html(
     query: str,
     *,
@@ -81,12 +136,7 @@ def _fetch_google_search_html(
     timeout_s: float,
     use_proxy: bool | None,
 ) -> str:
-    params = {"q": query, "num": str(num), "hl": "zh-CN"}
-    url = f"https://www.google.com/search?{urlencode(params)}"
-    headers = {
-        "User-Agent": _google_user_agent(),
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-    }
+    url, headers = _google_search_request(query, num)
     req = Request(url, headers=headers)
     proxy_handler = _build_proxy_handler(use_proxy)
     opener = build_opener(proxy_handler) if proxy_handler else build_opener()
@@ -95,6 +145,27 @@ def _fetch_google_search_html(
     return payload.decode("utf-8", errors="replace")
 
 
+async def _fetch_google_search_html_async(
+    query: str,
+    *,
+    num: int,
+    timeout_s: float,
+    use_proxy: bool | None,
+    session: aiohttp.ClientSession | None = None,
+) -> str:
+    url, headers = _google_search_request(query, num)
+    client = session or get_session()
+    async with client.get(
+        url,
+        headers=headers,
+        proxy=request_proxy(use_proxy),
+        timeout=aiohttp.ClientTimeout(total=timeout_s),
+    ) as resp:
+        resp.raise_for_status()
+        payload = await resp.read()
+    return payload.decode("utf-8", errors="replace")
+
+
 def _normalize_google_href(href: str) -> str | None:
     if href.startswith("/url?"):
         parsed = urlparse(href)
@@ -103,7 +174,7 @@ def _normalize_google_href(href: str) -> str | None:
         if candidate:
             return unquote(candidate)
         return None
-    if href.startswith("http://") or href.startswith("https://"):
+    if href.startswith(HTTP_PREFIXES):
         parsed = urlparse(href)
         if "google." in parsed.netloc or parsed.netloc.endswith("googleusercontent.com"):
             return None
@@ -111,22 +182,15 @@ def _normalize_google_href(href: str) -> str | None:
     return None
 
 
-def google_search_page_urls(
-    query: str,
-    *,
-    num: int = 5,
-    timeout_s: float = 10.0,
-    use_proxy: bool | None = None,
-) -> List[Dict[str, Any]]:
-    if not query:
-        raise ValueError("Missing google search query.")
-    html = _fetch_google_search_html(
-        query, num=num, timeout_s=timeout_s, use_proxy=use_proxy
-    )
-    soup = BeautifulSoup(html, "lxml")
+def _extract_google_result_urls(html: str, num: int) -> List[Dict[str, Any]]:
+    # 只需要链接，直接用 lxml 解析，不构建 BeautifulSoup 树
+    try:
+        links = lxml_html.document_fromstring(html).iter("a")
+    except (etree.ParserError, ValueError):
+        links = iter(())
     seen: set[str] = set()
     results: List[Dict[str, Any]] = []
-    for link in soup.select("a[href]"):
+    for link in links:
         href = link.get("href")
         if not href:
             continue
@@ -140,3 +204,34 @@ def google_search_page_urls(
     if not results:
         raise ValueError("No results found")
     return results
+
+
+def google_search_page_urls(
+    query: str,
+    *,
+    num: int = 5,
+    timeout_s: float = 10.0,
+    use_proxy: bool | None = None,
+) -> List[Dict[str, Any]]:
+    if not query:
+        raise ValueError("Missing google search query.")
+    html = _fetch_google_search_html(
+        query, num=num, timeout_s=timeout_s, use_proxy=use_proxy
+    )
+    return _extract_google_result_urls(html, num)
+
+
+async def google_search_page_urls_async(
+    query: str,
+    *,
+    num: int = 5,
+    timeout_s: float = 10.0,
+    use_proxy: bool | None = None,
+    session: aiohttp.ClientSession | None = None,
+) -> List[Dict[str, Any]]:
+    if not query:
+        raise ValueError("Missing google search query.")
+    html = await _fetch_google_search_html_async(
+        query, num=num, timeout_s=timeout_s, use_proxy=use_proxy, session=session
+    )
+    return _extract_google_result_urls(html, num)
@@ -18,18 +18,18 @@ def smart_image_to_pdf(
     if not image_path.exists():
         return False
 
+    img = None
     try:
-        # 打开图片
-        img = Image.open(image_path).convert("RGB")
+        # 打开图片，转换后立即关闭源文件
+        with Image.open(image_path) as source:
+            img = source.convert("RGB")
         width, total_height = img.size
         
         # 设定单页目标高度。假设宽度 1920，ratio 1.5，则每页高约 2880。
         # 这样一张 2.7亿像素(假设宽1920，高约14万)的图会被切成几十页，每页都很安全。
         target_height = int(width * max_page_height_ratio)
         
-        # 转换为 numpy 数组进行快速分析
-        # 注意：如果内存非常吃紧，这里可能需要分块读取，但一般机器 16GB 内存够用
-        img_arr = np.asarray(img)
+        # 只在每页的回溯区裁出中间一条转成 numpy 数组，不把整张图再复制一份
         
         pages = []
         current_y = 0
@@ -54,17 +54,24 @@ def smart_image_to_pdf(
                 center_end = int(width * 0.8)
                 
                 # 反向遍历 (寻找白色/纯色行)
-                # 切片：img_arr[y, x_start:x_end, :]
-                roi = img_arr[search_start_y:search_end_y, center_start:center_end, :]
+                # 裁剪框：(x_start, y_start, x_end, y_end)
+                roi = np.asarray(
+                    img.crop((center_start, search_start_y, center_end, search_end_y))
+                )
                 
                 # 计算每一行的标准差 (Standard Deviation)
-                # std < 5.0 通常意味着这一行颜色非常单一 (如白色背景)
-                # axis=1 计算行的 std，再取 mean 简化判断
-                stds = np.std(roi, axis=(1, 2)) 
+                # std < 10 通常意味着这一行颜色非常单一 (如白色背景)
+                # 用整数的和与平方和算方差：n·Σx² - (Σx)² < 10²·n²，
+                # 等价于 std < 10，但不用生成 float64 中间数组
+                flat = roi.reshape(roi.shape[0], -1)
+                n = flat.shape[1]
+                sums = flat.sum(axis=1, dtype=np.int64)
+                squares = np.einsum("ij,ij->i", flat, flat, dtype=np.int64)
+                spread = n * squares - sums * sums
                 
                 # 找到符合条件的行 (从下往上找，即 index 倒序)
                 # np.where 返回的是相对于 roi 的索引
-                candidates = np.where(stds < 10.0)[0]
+                candidates = np.where(spread < 100 * n * n)[0]
                 
                 if len(candidates) > 0:
                     # 找到最靠下的切割点
@@ -75,10 +82,8 @@ def smart_image_to_pdf(
                     print(f"Warning: No clean cut found between {search_start_y} and {search_end_y}, forcing cut.")
                     cut_y = search_end_y
 
-            # 3. 裁剪并保存
-            # Crop box: (left, upper, right, lower)
-            page_img = img.crop((0, current_y, width, cut_y))
-            pages.append(page_img)
+            # 3. 记录切分范围，保存时再逐页裁剪
+            pages.append((current_y, cut_y))
             
             print(f"  Added page: y={current_y} to {cut_y} (Height: {cut_y - current_y})")
             
@@ -91,18 +96,18 @@ def smart_image_to_pdf(
         # 4. 保存为多页 PDF
         if pages:
             print(f"Saving {len(pages)} pages to PDF...")
-            pages[0].save(
-                pdf_path, 
-                "PDF", 
-                resolution=72.0, 
-                save_all=True, 
-                append_images=pages[1:]
-            )
+            # 逐页裁剪并追加写入，内存里同时只有原图和一页，而不是原图再加全部分页
+            for index, (top, bottom) in enumerate(pages):
+                with img.crop((0, top, width, bottom)) as page_img:
+                    page_img.save(pdf_path, "PDF", resolution=72.0, append=index > 0)
             return True
             
     except Exception as e:
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        if img is not None:
+            img.close()
     
     return False
@@ -1,27 +1,34 @@
 from __future__ import annotations
 
 import asyncio
-import json
-import re
 from pathlib import Path
 from typing import Any, Dict
 from urllib.parse import parse_qs, quote, unquote, urlencode, urlparse
-from urllib.request import ProxyHandler, Request, build_opener
 
+import aiohttp
 from bs4 import BeautifulSoup
 
-from umamusume_web_crawler.config import config
+from umamusume_web_crawler.url_utils import HTTP_PREFIXES
+from umamusume_web_crawler.web.http_client import (
+    get_session,
+    request_json,
+    request_proxy,
+)
+from umamusume_web_crawler.web.mediawiki import (
+    extract_wikitext_from_page,
+    fetch_wikitext_expanded,
+    fetch_wikitexts,
+)
 
 
 DEFAULT_API_ENDPOINT = "https://umamusu.wiki/w/api.php"
 DEFAULT_BASE_URL = "https://umamusu.wiki/"
-_TRANSCLUSION_PATTERN = re.compile(r"\{\{:\s*([^}|]+)")
 
 
 def _normalize_title(value: str) -> str:
     if not value:
         return ""
-    if value.startswith("http://") or value.startswith("https://"):
+    if value.startswith(HTTP_PREFIXES):
         parsed = urlparse(value)
         if parsed.path.endswith("/index.php"):
             params = parse_qs(parsed.query)
@@ -55,41 +62,24 @@ def _build_api_url(endpoint: str, params: Dict[str, str]) -> str:
     return f"{endpoint}?{query}"
 
 
-def _build_opener(use_proxy: bool | None) -> object:
-    if use_proxy is False:
-        return build_opener(ProxyHandler({}))
-    proxy_url = config.proxy_url()
-    if not proxy_url:
-        return build_opener()
-    proxy_handler = ProxyHandler({"http": proxy_url, "https": proxy_url})
-    return build_opener(proxy_handler)
-
-
-def _request_json(
-    url: str, *, timeout_s: float, use_proxy: bool | None = None
+async def _request_json(
+    url: str, *, timeout_s: float, use_proxy: bool | None = None, cache: bool = True
 ) -> Dict[str, Any] | list[Any]:
-    headers = {
-        "User-Agent": config.user_agent,
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-    }
-    req = Request(url, headers=headers)
-    opener = _build_opener(use_proxy)
-    with opener.open(req, timeout=timeout_s) as resp:
-        payload = resp.read()
-    return json.loads(payload.decode("utf-8"))
+    return await request_json(
+        url, timeout_s=timeout_s, use_proxy=use_proxy, cache=cache
+    )
 
 
-def _request_bytes(
+async def _request_bytes(
     url: str, *, timeout_s: float, use_proxy: bool | None = None
 ) -> bytes:
-    headers = {
-        "User-Agent": config.user_agent,
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-    }
-    req = Request(url, headers=headers)
-    opener = _build_opener(use_proxy)
-    with opener.open(req, timeout=timeout_s) as resp:
-        return resp.read()
+    async with get_session().get(
+        url,
+        proxy=request_proxy(use_proxy),
+        timeout=aiohttp.ClientTimeout(total=timeout_s),
+    ) as resp:
+        resp.raise_for_status()
+        return await resp.read()
 
 
 def _extract_page(payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -102,20 +92,6 @@ def _extract_page(payload: Dict[str, Any]) -> Dict[str, Any]:
     return {}
 
 
-def _extract_wikitext_from_page(page: Dict[str, Any]) -> str:
-    revisions = page.get("revisions") or []
-    if not revisions:
-        return ""
-    revision = revisions[0]
-    if isinstance(revision, dict):
-        if "slots" in revision:
-            slots = revision.get("slots") or {}
-            main = slots.get("main") or {}
-            return str(main.get("*") or main.get("content") or "")
-        return str(revision.get("*") or revision.get("content") or "")
-    return ""
-
-
 def _extract_parse_html(payload: Dict[str, Any]) -> str:
     parse = payload.get("parse") or {}
     text = parse.get("text")
@@ -126,15 +102,6 @@ def _extract_parse_html(payload: Dict[str, Any]) -> str:
     return ""
 
 
-def _extract_transclusions(wikitext: str) -> list[str]:
-    titles: list[str] = []
-    for match in _TRANSCLUSION_PATTERN.finditer(wikitext or ""):
-        title = match.group(1).strip()
-        if title and title not in titles:
-            titles.append(title)
-    return titles
-
-
 def _extract_category_member_titles(payload: Dict[str, Any]) -> list[str]:
     query = payload.get("query", {})
     members = query.get("categorymembers")
@@ -186,8 +153,9 @@ async def search_umamusu_titles(
         "format": "json",
     }
     url = _build_api_url(endpoint, params)
-    payload = await asyncio.to_thread(
-        _request_json, url, timeout_s=timeout_s, use_proxy=use_proxy
+    # 搜索关键字千差万别，缓存命中率低，不写入磁盘缓存
+    payload = await _request_json(
+        url, timeout_s=timeout_s, use_proxy=use_proxy, cache=False
     )
     if isinstance(payload, list) and len(payload) > 1 and isinstance(payload[1], list):
         return [str(title) for title in payload[1] if title]
@@ -214,18 +182,31 @@ async def fetch_umamusu_wikitext(
         "titles": title,
     }
     url = _build_api_url(endpoint, params)
-    payload = await asyncio.to_thread(
-        _request_json, url, timeout_s=timeout_s, use_proxy=use_proxy
-    )
+    payload = await _request_json(url, timeout_s=timeout_s, use_proxy=use_proxy)
     if not isinstance(payload, dict):
         raise RuntimeError("umamusu.wiki API returned unexpected payload.")
     page = _extract_page(payload)
-    content = _extract_wikitext_from_page(page)
+    content = extract_wikitext_from_page(page)
     if not content:
         raise RuntimeError("umamusu.wiki API returned empty wikitext.")
     return content
 
 
+async def fetch_umamusu_wikitexts(
+    titles: list[str],
+    *,
+    endpoint: str = DEFAULT_API_ENDPOINT,
+    timeout_s: float = 30.0,
+    use_proxy: bool | None = None,
+    concurrency: int | None = None,
+) -> dict[str, str]:
+    async def _query(params: Dict[str, str]) -> object:
+        url = _build_api_url(endpoint, params)
+        return await _request_json(url, timeout_s=timeout_s, use_proxy=use_proxy)
+
+    return await fetch_wikitexts(titles, _query, concurrency=concurrency)
+
+
 async def fetch_umamusu_wikitext_expanded(
     title_or_url: str,
     *,
@@ -234,36 +215,26 @@ async def fetch_umamusu_wikitext_expanded(
     max_depth: int = 1,
     max_pages: int = 5,
     use_proxy: bool | None = None,
+    concurrency: int | None = None,
 ) -> str:
-    visited: set[str] = set()
-
-    async def _fetch(title: str, depth: int) -> str:
-        if not title or title in visited or len(visited) >= max_pages:
-            return ""
-        visited.add(title)
-        text = await fetch_umamusu_wikitext(
-            title, endpoint=endpoint, timeout_s=timeout_s, use_proxy=use_proxy
-        )
-        if depth <= 0:
-            return text
-        transclusions = _extract_transclusions(text)
-        if not transclusions:
-            return text
-        appended: list[str] = []
-        for child_title in transclusions:
-            if len(visited) >= max_pages:
-                break
-            child_text = await _fetch(child_title, depth - 1)
-            if child_text:
-                appended.append(f"\n\n== {child_title} ==\n{child_text}")
-        if appended:
-            return text + "".join(appended)
-        return text
-
     title = _normalize_title(title_or_url)
     if not title:
         raise ValueError("Missing umamusu.wiki page title.")
-    return await _fetch(title, max_depth)
+    return await fetch_wikitext_expanded(
+        title,
+        fetch_one=lambda page_title: fetch_umamusu_wikitext(
+            page_title, endpoint=endpoint, timeout_s=timeout_s, use_proxy=use_proxy
+        ),
+        fetch_many=lambda titles: fetch_umamusu_wikitexts(
+            titles,
+            endpoint=endpoint,
+            timeout_s=timeout_s,
+            use_proxy=use_proxy,
+            concurrency=concurrency,
+        ),
+        max_depth=max_depth,
+        max_pages=max_pages,
+    )
 
 
 async def fetch_umamusu_html(
@@ -284,9 +255,7 @@ async def fetch_umamusu_html(
         "page": title,
     }
     url = _build_api_url(endpoint, params)
-    payload = await asyncio.to_thread(
-        _request_json, url, timeout_s=timeout_s, use_proxy=use_proxy
-    )
+    payload = await _request_json(url, timeout_s=timeout_s, use_proxy=use_proxy)
     if not isinstance(payload, dict):
         raise RuntimeError("umamusu.wiki API returned unexpected payload.")
     html = _extract_parse_html(payload)
@@ -347,9 +316,7 @@ async def list_umamusu_category_files(
             params["cmcontinue"] = cmcontinue
 
         url = _build_api_url(endpoint, params)
-        payload = await asyncio.to_thread(
-            _request_json, url, timeout_s=timeout_s, use_proxy=use_proxy
-        )
+        payload = await _request_json(url, timeout_s=timeout_s, use_proxy=use_proxy)
         if not isinstance(payload, dict):
             raise RuntimeError("umamusu.wiki category API returned unexpected payload.")
 
@@ -389,9 +356,7 @@ async def fetch_umamusu_image_info(
         "formatversion": "2",
     }
     url = _build_api_url(endpoint, params)
-    payload = await asyncio.to_thread(
-        _request_json, url, timeout_s=timeout_s, use_proxy=use_proxy
-    )
+    payload = await _request_json(url, timeout_s=timeout_s, use_proxy=use_proxy)
     if not isinstance(payload, dict):
         raise RuntimeError("umamusu.wiki image API returned unexpected payload.")
     page = _extract_page(payload)
@@ -422,8 +387,8 @@ async def download_umamusu_file(
     directory.mkdir(parents=True, exist_ok=True)
     filename = _filename_from_file_title(str(info["title"]))
     output_path = directory / filename
-    payload = await asyncio.to_thread(
-        _request_bytes, str(info["url"]), timeout_s=timeout_s, use_proxy=use_proxy
+    payload = await _request_bytes(
+        str(info["url"]), timeout_s=timeout_s, use_proxy=use_proxy
     )
     await asyncio.to_thread(output_path.write_bytes, payload)
     return {
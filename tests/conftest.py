@@ -0,0 +1,50 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+# 未安装本包时（直接 pytest 而非 uv run）也能导入 src 下的源码
+_SRC = str(Path(__file__).resolve().parent.parent / "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+if uvloop is not None:
+
+    @pytest.fixture(scope="session")
+    def event_loop_policy():
+        """装了 uvloop 时异步测试也跑在 uvloop 上，与 CLI/MCP 入口一致。"""
+        return uvloop.EventLoopPolicy()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def live_network():
+    """联网测试共用一个事件循环，get_session() 与浏览器池在测试之间复用连接。"""
+    yield
+    from umamusume_web_crawler.web.browser_pool import close_browser_pool
+    from umamusume_web_crawler.web.http_client import close_session
+
+    await close_session()
+    await close_browser_pool()
+
+
+@pytest.fixture(scope="session")
+def results_dir() -> Path:
+    """联网测试的输出目录，整个会话只创建一次。"""
+    output_dir = Path("results") / "test"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
+
+
+@pytest.fixture(scope="session")
+def visual_dir(results_dir: Path) -> Path:
+    """截图/PDF 输出目录，可用 CRAWLER_VISUAL_DIR 覆盖。"""
+    output_dir = Path(os.getenv("CRAWLER_VISUAL_DIR", str(results_dir / "visual")))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
@@ -1,5 +1,3 @@
-import os
-import sys
 import json
 from argparse import Namespace
 from unittest.mock import AsyncMock
@@ -7,9 +5,8 @@ from unittest.mock import AsyncMock
 import pytest
 from bs4 import BeautifulSoup
 
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
-
 from umamusume_web_crawler import cli
+from umamusume_web_crawler.web import biligame_assets
 from umamusume_web_crawler.web.biligame_assets import (
     CharacterAssetTarget,
     DEFAULT_AUDIO_OUTPUT_ROOT,
@@ -293,7 +290,9 @@ async def test_persistent_rate_limit_aborts_remaining_pages(tmp_path, monkeypatc
 @pytest.mark.asyncio
 async def test_cli_routes_biligame_assets_task(monkeypatch) -> None:
     mock_crawl = AsyncMock(return_value={"total": 1, "success": 1})
-    monkeypatch.setattr(cli, "crawl_biligame_character_assets", mock_crawl)
+    monkeypatch.setattr(
+        biligame_assets, "crawl_biligame_character_assets", mock_crawl
+    )
 
     args = Namespace(
         task="biligame-assets",
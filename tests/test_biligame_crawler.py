@@ -1,68 +1,74 @@
 import asyncio
 import os
-import sys
-from urllib.parse import unquote, urlparse
 from pathlib import Path
 
 import pytest
 
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
-
+from umamusume_web_crawler.runner import run_async
+from umamusume_web_crawler.url_utils import title_from_url
 from umamusume_web_crawler.web.biligame import (
     fetch_biligame_wikitext_expanded,
     search_biligame_titles,
 )
+from umamusume_web_crawler.web.crawler import crawl_biligame_page_visual_markitdown
 from umamusume_web_crawler.web.parse_wiki_infobox import (
     parse_wiki_page,
     wiki_page_to_llm_markdown,
 )
 
+TARGET_URL = os.getenv(
+    "CRAWLER_BILIGAME_URL",
+    "https://wiki.biligame.com/umamusume/东海帝皇",
+)
+KEYWORD = os.getenv("CRAWLER_BILIGAME_QUERY", "东海帝皇")
 
-def _title_from_url(value: str) -> str:
-    if not value.startswith("http://") and not value.startswith("https://"):
-        return value
-    parsed = urlparse(value)
-    return unquote(parsed.path.strip("/").split("/")[-1])
+MODES = ("api_expanded", "visual_markitdown")
 
 
-async def _run() -> None:
-    target_url = os.getenv(
-        "CRAWLER_BILIGAME_URL",
-        "https://wiki.biligame.com/umamusume/东海帝皇",
-    )
-    keyword = os.getenv("CRAWLER_BILIGAME_QUERY", "东海帝皇")
+async def _run(mode: str, output_dir: Path) -> None:
     try:
-        titles = await search_biligame_titles(keyword)
-        if titles:
-            print(f"Search results for {keyword!r}: {titles}")
-            target_title = titles[0]
+        if mode == "visual_markitdown":
+            content = await crawl_biligame_page_visual_markitdown(TARGET_URL)
         else:
-            print(f"No search results for {keyword!r}, fallback to URL")
-            target_title = target_url
-        content = await fetch_biligame_wikitext_expanded(
-            target_title, max_depth=1, max_pages=5
-        )
-        output_name = "biligame_api.md"
+            titles = await search_biligame_titles(KEYWORD)
+            if titles:
+                print(f"Search results for {KEYWORD!r}: {titles}")
+                target_title = titles[0]
+            else:
+                print(f"No search results for {KEYWORD!r}, fallback to URL")
+                target_title = TARGET_URL
+            content = await fetch_biligame_wikitext_expanded(
+                target_title, max_depth=1, max_pages=5
+            )
     except asyncio.TimeoutError:
         print("TEST_RESULT: FAILED (timeout)")
         raise
     assert isinstance(content, str)
     assert content.strip(), "Expected non-empty crawl content"
-    page = parse_wiki_page(content, site="biligame")
-    heading = target_title if titles else _title_from_url(target_title)
-    content = wiki_page_to_llm_markdown(heading, page, site="biligame")
-    output_dir = Path("results") / "test"
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if mode == "visual_markitdown":
+        output_name = "biligame_visual_markitdown.md"
+    else:
+        page = parse_wiki_page(content, site="biligame")
+        content = wiki_page_to_llm_markdown(
+            title_from_url(target_title), page, site="biligame"
+        )
+        output_name = "biligame_api.md"
     output_path = output_dir / output_name
     output_path.write_text(content, encoding="utf-8")
     print(f"Wrote {len(content)} chars to {output_path}")
     print("TEST_RESULT: PASSED")
 
 
-@pytest.mark.asyncio
-async def test_biligame_crawler() -> None:
-    await _run()
+@pytest.mark.network
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("live_network")
+@pytest.mark.parametrize("mode", MODES)
+async def test_biligame_crawler(mode: str, results_dir: Path) -> None:
+    await _run(mode, results_dir)
 
 
 if __name__ == "__main__":
-    asyncio.run(_run())
+    _output_dir = Path("results") / "test"
+    _output_dir.mkdir(parents=True, exist_ok=True)
+    for _mode in MODES:
+        run_async(_run(_mode, _output_dir))
@@ -0,0 +1,59 @@
+
+import pytest
+
+from umamusume_web_crawler.web.browser_pool import BrowserPool
+
+
+class _FakeCrawler:
+    def __init__(self) -> None:
+        self.started = False
+        self.closed = False
+
+    async def start(self) -> None:
+        self.started = True
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_reuses_idle_crawler_per_key() -> None:
+    pool = BrowserPool()
+    created: list[_FakeCrawler] = []
+
+    def factory() -> _FakeCrawler:
+        created.append(_FakeCrawler())
+        return created[-1]
+
+    async with pool.acquire("a", factory) as first:
+        assert first.started
+    async with pool.acquire("a", factory) as second:
+        assert second is first
+    async with pool.acquire("b", factory) as other:
+        assert other is not first
+
+    assert len(created) == 2
+    await pool.close()
+    assert all(crawler.closed for crawler in created)
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_closes_crawler_after_error_and_expiry() -> None:
+    pool = BrowserPool(idle_ttl_s=-1.0)
+    created: list[_FakeCrawler] = []
+
+    def factory() -> _FakeCrawler:
+        created.append(_FakeCrawler())
+        return created[-1]
+
+    with pytest.raises(RuntimeError):
+        async with pool.acquire("a", factory):
+            raise RuntimeError("boom")
+    assert created[0].closed
+
+    async with pool.acquire("a", factory):
+        pass
+    async with pool.acquire("a", factory) as fresh:
+        assert fresh is created[2]
+    assert created[1].closed
+    await pool.close()
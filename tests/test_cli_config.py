@@ -1,29 +1,37 @@
 import sys
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock
 from umamusume_web_crawler.config import config
 from umamusume_web_crawler.cli import main
 
-def test_cli_google_api_key_override():
+def test_cli_google_api_key_override(monkeypatch):
     test_key = "TEST_API_KEY_123"
     test_cse = "TEST_CSE_ID_456"
-    
-    # Store original config values to restore later
-    original_api_key = config.google_api_key
-    original_cse_id = config.google_cse_id
-    
-    try:
-        # Mock sys.argv
-        with patch.object(sys, "argv", ["umamusume-crawler", "--url", "http://example.com", "--google-api-key", test_key, "--google-cse-id", test_cse]):
-            # Mock _run to prevent actual execution, using AsyncMock because it's awaited
-            with patch("umamusume_web_crawler.cli._run", new_callable=AsyncMock) as mock_run:
-                # Mock load_dotenv to avoid side effects from local .env files during this specific test
-                with patch("umamusume_web_crawler.cli.load_dotenv"):
-                    main()
-                    
-                    assert config.google_api_key == test_key
-                    assert config.google_cse_id == test_cse
-                    mock_run.assert_called_once()
-    finally:
-        # Restore configuration
-        config.google_api_key = original_api_key
-        config.google_cse_id = original_cse_id
+
+    # monkeypatch 在测试结束时自动还原 config 与被替换的对象
+    monkeypatch.setattr(config, "google_api_key", config.google_api_key)
+    monkeypatch.setattr(config, "google_cse_id", config.google_cse_id)
+    monkeypatch.setattr(sys, "argv", ["umamusume-crawler", "--url", "http://example.com", "--google-api-key", test_key, "--google-cse-id", test_cse])
+    # Mock _run to prevent actual execution, using AsyncMock because it's awaited
+    mock_run = AsyncMock()
+    monkeypatch.setattr("umamusume_web_crawler.cli._run", mock_run)
+    # Mock load_dotenv to avoid side effects from local .env files during this specific test
+    monkeypatch.setattr("umamusume_web_crawler.cli.load_dotenv", MagicMock())
+
+    main()
+
+    assert config.google_api_key == test_key
+    assert config.google_cse_id == test_cse
+    mock_run.assert_called_once()
+
+
+def test_update_from_env_rereads_unless_once(monkeypatch):
+    from umamusume_web_crawler.config import Config
+
+    cfg = Config()
+    monkeypatch.setenv("GOOGLE_API_KEY", "first")
+    cfg.update_from_env()
+    monkeypatch.setenv("GOOGLE_API_KEY", "second")
+    cfg.update_from_env(once=True)
+    assert cfg.google_api_key == "first"
+    cfg.update_from_env()
+    assert cfg.google_api_key == "second"
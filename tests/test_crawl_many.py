@@ -0,0 +1,317 @@
+import asyncio
+
+import pytest
+
+from umamusume_web_crawler.web import crawler as crawler_module
+from umamusume_web_crawler.web.browser_pool import BrowserPool
+
+
+class _FakeCrawler:
+    opened = 0
+
+    def __init__(self, **kwargs) -> None:
+        pass
+
+    async def start(self) -> None:
+        _FakeCrawler.opened += 1
+
+    async def close(self) -> None:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_crawl_many_shares_crawler_and_bounds_concurrency(monkeypatch) -> None:
+    active = 0
+    peak = 0
+    seen_crawlers: set[int] = set()
+
+    async def fake_crawl_page(url: str, **kwargs) -> str:
+        nonlocal active, peak
+        seen_crawlers.add(id(kwargs["crawler"]))
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if url.endswith("bad"):
+            raise RuntimeError("boom")
+        return f"content:{url}"
+
+    _FakeCrawler.opened = 0
+    monkeypatch.setattr(crawler_module, "AsyncWebCrawler", _FakeCrawler)
+    monkeypatch.setattr(crawler_module, "browser_pool", BrowserPool())
+    monkeypatch.setattr(crawler_module, "crawl_page", fake_crawl_page)
+
+    urls = [f"https://example.com/{index}" for index in range(6)]
+    urls += ["https://example.com/0", "https://example.com/bad"]
+    contents = await crawler_module.crawl_many(urls, concurrency=2)
+
+    assert contents == {url: f"content:{url}" for url in urls[:6]}
+    assert peak == 2
+    assert _FakeCrawler.opened == 1
+    assert len(seen_crawlers) == 1
+
+
+class _Result:
+    def __init__(self, html: str) -> None:
+        self.html = html
+
+
+@pytest.mark.asyncio
+async def test_arun_backs_off_on_gateway_timeout(monkeypatch) -> None:
+    pages = ["<html><h1>504 Gateway Time-out</h1></html>", "<html><body>ok</body></html>"]
+    calls: list[str] = []
+    delays: list[float] = []
+
+    class FakeCrawler:
+        async def arun(self, *, url: str, config: object) -> _Result:
+            calls.append(url)
+            return _Result(pages[len(calls) - 1])
+
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr(crawler_module.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(crawler_module.random, "random", lambda: 0.0)
+
+    result = await crawler_module._arun(
+        FakeCrawler(), "https://wiki.biligame.com/umamusume/x", object(), None
+    )
+
+    assert result.html == pages[1]
+    assert len(calls) == 2
+    assert delays == [1]
+
+
+@pytest.mark.asyncio
+async def test_arun_raises_when_gateway_timeout_persists(monkeypatch) -> None:
+    calls: list[str] = []
+
+    class FakeCrawler:
+        async def arun(self, *, url: str, config: object) -> _Result:
+            calls.append(url)
+            return _Result("<html><h1>504 Gateway Time-out</h1></html>")
+
+    async def fake_sleep(delay: float) -> None:
+        return None
+
+    monkeypatch.setattr(crawler_module.asyncio, "sleep", fake_sleep)
+
+    with pytest.raises(RuntimeError, match="Gateway timeout"):
+        await crawler_module._arun(
+            FakeCrawler(), "https://example.com/x", object(), None, gateway_retries=2
+        )
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_browser_slot_caps_crawls_and_allows_nesting(monkeypatch) -> None:
+    monkeypatch.setattr(crawler_module.config, "crawler_visual_concurrency", 1)
+    monkeypatch.setattr(crawler_module, "_browser_slots_loop", None)
+    active = 0
+    peak = 0
+
+    async def capture() -> str:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "ok"
+
+    async def wrapper() -> str:
+        # 外层已持有名额，内层同类调用不应再排队
+        return await crawler_module._run_with_timeout(capture, 5.0, slot="visual")
+
+    results = await asyncio.gather(
+        *(
+            crawler_module._run_with_timeout(wrapper, 5.0, slot="visual")
+            for _ in range(3)
+        )
+    )
+
+    assert results == ["ok", "ok", "ok"]
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_crawl_slot_does_not_bypass_visual_slot(monkeypatch) -> None:
+    monkeypatch.setattr(crawler_module.config, "crawler_visual_concurrency", 1)
+    monkeypatch.setattr(crawler_module.config, "crawler_browser_concurrency", 3)
+    monkeypatch.setattr(crawler_module, "_browser_slots_loop", None)
+    active = 0
+    peak = 0
+
+    async def capture() -> str:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "ok"
+
+    async def wrapper() -> str:
+        # 持有 crawl 名额时进入 visual 抓取，仍要受 visual 上限约束
+        return await crawler_module._run_with_timeout(capture, 5.0, slot="visual")
+
+    results = await asyncio.gather(
+        *(
+            crawler_module._run_with_timeout(wrapper, 5.0, slot="crawl")
+            for _ in range(3)
+        )
+    )
+
+    assert results == ["ok", "ok", "ok"]
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_page_reuses_content_and_skips_file_outputs(
+    tmp_path, monkeypatch
+) -> None:
+    from umamusume_web_crawler.web import cache
+
+    cache.clear_memory_cache()
+    monkeypatch.setattr(crawler_module.config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(crawler_module.config, "crawler_cache_ttl_s", 60.0)
+    calls: list[str] = []
+
+    @crawler_module._cached_page
+    async def fake_crawl(
+        url: str,
+        *,
+        use_proxy: bool = False,
+        output_dir=None,
+        timeout_s: float | None = None,
+    ) -> str:
+        calls.append(url)
+        return f"content:{url}:{len(calls)}"
+
+    url = "https://wiki.biligame.com/umamusume/x"
+    first = await fake_crawl(url)
+    assert await fake_crawl(url, timeout_s=5.0) == first
+    assert await fake_crawl(url, use_proxy=True) != first
+    await fake_crawl(url, output_dir=tmp_path)
+    await fake_crawl(url, output_dir=tmp_path)
+
+    assert len(calls) == 4
+    cache.clear_memory_cache()
+
+
+@pytest.mark.asyncio
+async def test_cached_page_lookup_does_not_block_event_loop(
+    tmp_path, monkeypatch
+) -> None:
+    from umamusume_web_crawler.web import cache
+
+    cache.clear_memory_cache()
+    monkeypatch.setattr(crawler_module.config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(crawler_module.config, "crawler_cache_ttl_s", 60.0)
+
+    @crawler_module._cached_page
+    async def fake_crawl(url: str) -> str:
+        return "content"
+
+    # 其他线程持有连接锁期间，事件循环上的其他任务仍应继续运行
+    cache._conn_lock.acquire()
+    try:
+        lookup = asyncio.create_task(fake_crawl("https://example.com/x"))
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert ticks == 5
+        assert not lookup.done()
+    finally:
+        cache._conn_lock.release()
+
+    assert await lookup == "content"
+    cache.clear_memory_cache()
+
+
+@pytest.mark.asyncio
+async def test_singleflight_shares_in_flight_fetch() -> None:
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "page"
+
+    first = asyncio.create_task(crawler_module._singleflight("k", fetch))
+    second = asyncio.create_task(crawler_module._singleflight("k", fetch))
+    third = asyncio.create_task(crawler_module._singleflight("k", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "page"
+    assert await third == "page"
+    assert calls == 1
+    assert "k" not in crawler_module._in_flight
+
+
+@pytest.mark.asyncio
+async def test_crawl_multi_yields_in_completion_order() -> None:
+    delays = {"slow": 0.03, "fast": 0.0, "bad": 0.01}
+
+    async def fetch(url: str) -> str:
+        await asyncio.sleep(delays[url])
+        if url == "bad":
+            raise RuntimeError("boom")
+        return url.upper()
+
+    results = [
+        item
+        async for item in crawler_module.crawl_multi(
+            ["slow", "fast", "bad", "fast"], fetch, concurrency=3
+        )
+    ]
+
+    assert results == [("fast", "FAST"), ("slow", "SLOW")]
+
+
+@pytest.mark.asyncio
+async def test_arun_kills_session_page_on_timeout() -> None:
+    killed: list[str] = []
+
+    class FakeManager:
+        async def kill_session(self, session_id: str) -> None:
+            killed.append(session_id)
+
+    class FakeStrategy:
+        browser_manager = FakeManager()
+
+    class FakeCrawler:
+        crawler_strategy = FakeStrategy()
+
+        async def arun(self, *, url: str, config: object) -> _Result:
+            await asyncio.sleep(1)
+            return _Result("")
+
+    class RunConfig:
+        session_id = "visual-page-1"
+
+    with pytest.raises(asyncio.TimeoutError):
+        await crawler_module._arun(
+            FakeCrawler(), "https://example.com/x", RunConfig(), 0.01
+        )
+
+    assert killed == ["visual-page-1"]
+
+
+def test_stream_b64_to_file_keeps_existing_file_on_decode_error(tmp_path) -> None:
+    target = tmp_path / "capture.png"
+    target.write_bytes(b"old")
+    # 首块合法、第二块非法：失败时原文件应保持不变且不留临时文件
+    value = "AAAA" + "!!!!"
+
+    assert not crawler_module._stream_b64_to_file(value, target, chunk_size=4)
+    assert target.read_bytes() == b"old"
+    assert list(tmp_path.iterdir()) == [target]
+
+    assert crawler_module._stream_b64_to_file("aGVsbG8=", target, chunk_size=4)
+    assert target.read_bytes() == b"hello"
+    assert list(tmp_path.iterdir()) == [target]
@@ -4,20 +4,18 @@ import sys
 
 import pytest
 
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
-
 from umamusume_web_crawler.web.crawler import crawl_page
 
 
-@pytest.mark.asyncio
-async def test_crawl_page_returns_content() -> None:
-    target_url = os.getenv(
-        "CRAWLER_TEST_URL",
-        "https://example.com",
-    )
+TARGET_URL = os.getenv("CRAWLER_TEST_URL", "https://example.com")
 
+
+@pytest.mark.network
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("live_network")
+async def test_crawl_page_returns_content() -> None:
     try:
-        content = await crawl_page(target_url, use_proxy=False)
+        content = await crawl_page(TARGET_URL, use_proxy=False)
     except asyncio.TimeoutError:
         print("TEST_RESULT: FAILED (timeout)")
         raise
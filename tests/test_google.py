@@ -1,19 +1,17 @@
 import os
-import sys
 
 import pytest
 from dotenv import load_dotenv
 
 load_dotenv()
 
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
-
 from umamusume_web_crawler.config import config
 from umamusume_web_crawler.web.search import google_search_urls
 
 config.update_from_env()
 
 
+@pytest.mark.network
 def test_google_search_urls() -> None:
     if not os.getenv("GOOGLE_API_KEY") or not os.getenv("GOOGLE_CSE_ID"):
         print("TEST_RESULT: SKIPPED (GOOGLE_API_KEY/GOOGLE_CSE_ID not set)")
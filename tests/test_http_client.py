@@ -0,0 +1,102 @@
+import pytest
+from aiohttp import web
+
+from umamusume_web_crawler.config import config
+from umamusume_web_crawler.web import http_client
+
+
+@pytest.mark.asyncio
+async def test_request_json_reuses_body_on_not_modified(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "crawler_cache_ttl_s", 60.0)
+    seen_etags: list[str | None] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({"title": "东海帝王"}, headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/api.php", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/api.php?action=query"
+    try:
+        first = await http_client.request_json(url, timeout_s=5, use_proxy=False)
+        second = await http_client.request_json(url, timeout_s=5, use_proxy=False)
+    finally:
+        await http_client.close_session()
+        await runner.cleanup()
+
+    assert first == second == {"title": "东海帝王"}
+    assert seen_etags == [None, '"v1"']
+
+
+@pytest.mark.asyncio
+async def test_request_json_reuses_fresh_body_without_validators(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "crawler_cache_ttl_s", 60.0)
+    hits: list[str] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        hits.append(request.query["action"])
+        if request.query["action"] == "error":
+            return web.json_response({"error": {"code": "ratelimited"}})
+        return web.json_response({"title": "东海帝王"})
+
+    app = web.Application()
+    app.router.add_get("/api.php", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}/api.php"
+    try:
+        for action in ("query", "query", "error", "error"):
+            await http_client.request_json(
+                f"{base}?action={action}", timeout_s=5, use_proxy=False
+            )
+    finally:
+        await http_client.close_session()
+        await runner.cleanup()
+
+    assert hits == ["query", "error", "error"]
+
+
+@pytest.mark.asyncio
+async def test_request_json_without_cache_always_hits_server(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "crawler_cache_ttl_s", 60.0)
+    hits: list[str] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        hits.append(request.query["search"])
+        return web.json_response(["东海", ["东海帝皇"]])
+
+    app = web.Application()
+    app.router.add_get("/api.php", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/api.php?action=opensearch&search=东海"
+    try:
+        for _ in range(2):
+            await http_client.request_json(
+                url, timeout_s=5, use_proxy=False, cache=False
+            )
+    finally:
+        await http_client.close_session()
+        await runner.cleanup()
+
+    assert hits == ["东海", "东海"]
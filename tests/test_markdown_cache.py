@@ -0,0 +1,102 @@
+import time
+
+from umamusume_web_crawler.config import config
+from umamusume_web_crawler.web import cache
+
+
+def test_markdown_cache_round_trip(tmp_path, monkeypatch) -> None:
+    cache.clear_memory_cache()
+    monkeypatch.setattr(config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "crawler_cache_ttl_s", 60.0)
+    key = cache.markdown_cache_key(
+        "https://wiki.biligame.com/umamusume/东海帝皇",
+        "biligame",
+        max_depth=1,
+        max_pages=5,
+    )
+
+    assert cache.load_cached_markdown(key) is None
+    cache.store_cached_markdown(key, "# 东海帝皇")
+    assert cache.load_cached_markdown(key) == "# 东海帝皇"
+
+
+def test_markdown_cache_expires(tmp_path, monkeypatch) -> None:
+    cache.clear_memory_cache()
+    monkeypatch.setattr(config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "crawler_cache_ttl_s", 60.0)
+    cache.store_cached_markdown("biligame:1:5:page", "cached")
+
+    now = time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now + 120.0)
+
+    assert cache.load_cached_markdown("biligame:1:5:page") is None
+
+
+def test_markdown_cache_serves_memory_hits_without_sqlite(
+    tmp_path, monkeypatch
+) -> None:
+    cache.clear_memory_cache()
+    monkeypatch.setattr(config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "crawler_cache_ttl_s", 60.0)
+    cache.store_cached_markdown("moegirl:1:5:page", "cached")
+
+    def _fail_connect():
+        raise AssertionError("sqlite should not be touched on a memory hit")
+
+    monkeypatch.setattr(cache, "_connect", _fail_connect)
+
+    assert cache.load_cached_markdown("moegirl:1:5:page") == "cached"
+
+
+def test_cache_reuses_one_sqlite_connection(tmp_path, monkeypatch) -> None:
+    cache.clear_memory_cache()
+    cache.close_cache()
+    monkeypatch.setattr(config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "crawler_cache_ttl_s", 60.0)
+    opened = []
+    real_connect = cache.sqlite3.connect
+
+    def counting_connect(*args, **kwargs):
+        opened.append(args)
+        return real_connect(*args, **kwargs)
+
+    monkeypatch.setattr(cache.sqlite3, "connect", counting_connect)
+    cache.store_cached_markdown("biligame:1:5:a", "a")
+    cache.store_http_body("https://example.org/api", b"{}")
+    cache.clear_memory_cache()
+    assert cache.load_cached_markdown("biligame:1:5:a") == "a"
+    assert cache.load_http_cache("https://example.org/api") == (None, b"{}")
+
+    assert len(opened) == 1
+    cache.close_cache()
+
+
+def test_cache_prunes_expired_and_excess_rows(tmp_path, monkeypatch) -> None:
+    cache.clear_memory_cache()
+    cache.close_cache()
+    monkeypatch.setattr(config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "crawler_cache_ttl_s", 60.0)
+    monkeypatch.setattr(cache, "_MAX_ROWS_PER_TABLE", 2)
+    now = time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now)
+    cache.store_http_body("https://example.org/old", b"{}")
+    # 首次写入已触发过清理，间隔内不再清理
+    for index in range(3):
+        cache.store_http_body(f"https://example.org/{index}", b"{}")
+
+    monkeypatch.setattr(cache.time, "time", lambda: now + 90.0)
+    monkeypatch.setattr(cache, "_last_prune", 0.0)
+    cache.store_http_body("https://example.org/new", b"{}")
+
+    with cache._transaction() as conn:
+        urls = {row[0] for row in conn.execute("SELECT url FROM http_bodies")}
+    assert urls == {"https://example.org/new"}
+
+    monkeypatch.setattr(cache, "_last_prune", 0.0)
+    for index in range(3):
+        cache.store_http_body(f"https://example.org/n{index}", b"{}")
+        monkeypatch.setattr(cache, "_last_prune", 0.0)
+    with cache._transaction() as conn:
+        (count,) = conn.execute("SELECT COUNT(*) FROM http_bodies").fetchone()
+    assert count == 2
+    cache.close_cache()
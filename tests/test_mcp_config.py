@@ -1,5 +1,8 @@
 import sys
 from unittest.mock import patch
+
+import pytest
+
 from umamusume_web_crawler.mcp.server import main
 
 def test_mcp_server_load_dotenv():
@@ -12,3 +15,70 @@ def test_mcp_server_load_dotenv():
                  main()
                  mock_load_dotenv.assert_called_once()
                  mock_run.assert_called_once()
+
+
+def test_each_starlette_app_runs_its_own_session_manager(monkeypatch):
+    from starlette.testclient import TestClient
+
+    from umamusume_web_crawler.mcp import server
+
+    async def fake_prewarm(hosts):
+        return None
+
+    monkeypatch.setattr(server, "prewarm", fake_prewarm)
+    # 同一进程里先后启动两个 app，各自的 session manager 都要能 run()
+    for _ in range(2):
+        app = server.create_starlette_app(server.mcp._mcp_server)
+        with TestClient(app):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_crawl_wiki_tool_keeps_loop_responsive_while_cache_locked(
+    tmp_path, monkeypatch
+):
+    import asyncio
+    import threading
+
+    from umamusume_web_crawler.config import config
+    from umamusume_web_crawler.mcp import server
+    from umamusume_web_crawler.web import cache
+
+    cache.clear_memory_cache()
+    monkeypatch.setattr(config, "crawler_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "crawler_cache_ttl_s", 60.0)
+
+    async def fake_expanded(url, **kwargs):
+        return "'''东海帝皇'''"
+
+    monkeypatch.setattr(server, "fetch_biligame_wikitext_expanded", fake_expanded)
+
+    # 另一个线程持有缓存连接锁（如 request_json 的写入或清理）
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with cache._conn_lock:
+            locked.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+    try:
+        call = asyncio.create_task(
+            server.crawl_biligame_wiki("https://wiki.biligame.com/umamusume/东海帝皇")
+        )
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert ticks == 5
+        assert not call.done()
+    finally:
+        release.set()
+        holder.join()
+
+    result = await call
+    assert result["status"] == "success"
+    cache.clear_memory_cache()
@@ -14,7 +14,6 @@ Notes:
 """
 
 import argparse
-import asyncio
 import json
 import os
 from typing import Any, Dict, Optional
@@ -25,8 +24,21 @@ from langchain_mcp_adapters.tools import load_mcp_tools
 from mcp import ClientSession
 from mcp.client.streamable_http import streamable_http_client
 
+from umamusume_web_crawler.runner import run_async
+
 load_dotenv()
 
+MCP_URL = os.getenv("MCP_URL", "http://127.0.0.1:7777/mcp/")
+MCP_TOOL_NAME = os.getenv("MCP_TOOL_NAME", "crawl_biligame_wiki")
+MCP_TOOL_QUERY = os.getenv(
+    "MCP_TOOL_QUERY",
+    "url=https://wiki.biligame.com/umamusume/爱慕织姬",
+)
+
+_JSON_LITERALS = {"true": True, "false": False, "null": None}
+# 只有可能是 JSON 数字、数组、对象或字符串的值才交给 json.loads，URL 等普通字符串不走异常路径
+_JSON_VALUE_START = frozenset('-0123456789[{"NI')
+
 
 def parse_tool_args(args_str_list: list) -> Dict[str, Any]:
     """
@@ -43,10 +55,14 @@ def parse_tool_args(args_str_list: list) -> Dict[str, Any]:
         k, v = item.split("=", 1)
 
         # 尝试类型解析
-        try:
-            v = json.loads(v.lower() if v.lower() in ("true", "false", "null") else v)
-        except json.JSONDecodeError:
-            pass  # keep as string
+        literal = v.lower()
+        if literal in _JSON_LITERALS:
+            v = _JSON_LITERALS[literal]
+        elif v.lstrip()[:1] in _JSON_VALUE_START:
+            try:
+                v = json.loads(v)
+            except json.JSONDecodeError:
+                pass  # keep as string
 
         result[k] = v
     return result
@@ -103,8 +119,8 @@ async def async_main(
                         else result
                     )
 
-                    # 可选：结构化解析（如果返回的是 JSON 字符串）
-                    if isinstance(result, str):
+                    # 可选：结构化解析（如果返回的是 JSON 字符串）；Markdown 结果不进解析器
+                    if isinstance(result, str) and result.lstrip()[:1] in ("{", "["):
                         try:
                             parsed = json.loads(result)
                             print("🔍 JSON 解析结果:")
@@ -120,18 +136,12 @@ async def async_main(
                     return None
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
 async def test_mcp_tool_call() -> None:
-    server_url = os.getenv("MCP_URL", "http://127.0.0.1:7777/mcp/")
-    tool_name = os.getenv("MCP_TOOL_NAME", "crawl_biligame_wiki")
-    tool_args = parse_tool_args(
-        [
-            os.getenv(
-                "MCP_TOOL_QUERY",
-                "url=https://wiki.biligame.com/umamusume/爱慕织姬",
-            )
-        ]
-    )
+    server_url = MCP_URL
+    tool_name = MCP_TOOL_NAME
+    tool_args = parse_tool_args([MCP_TOOL_QUERY])
 
     try:
         async with streamable_http_client(server_url) as (read_stream, write_stream, _):
@@ -195,7 +205,7 @@ if __name__ == "__main__":
     tool_args = parse_tool_args(args.tool_arg) if args.tool_arg else None
 
     # 运行主函数
-    asyncio.run(
+    run_async(
         async_main(
             server_url=args.base_url,
             tool_name=args.tool_name,
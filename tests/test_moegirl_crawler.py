@@ -1,13 +1,12 @@
 import asyncio
 import os
-import sys
-from urllib.parse import unquote, urlparse
 from pathlib import Path
 
 import pytest
 
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
-
+from umamusume_web_crawler.runner import run_async
+from umamusume_web_crawler.url_utils import title_from_url
+from umamusume_web_crawler.web import moegirl
 from umamusume_web_crawler.web.moegirl import (
     fetch_moegirl_wikitext_expanded,
     search_moegirl_titles,
@@ -18,27 +17,22 @@ from umamusume_web_crawler.web.parse_wiki_infobox import (
 )
 
 
-def _title_from_url(value: str) -> str:
-    if not value.startswith("http://") and not value.startswith("https://"):
-        return value
-    parsed = urlparse(value)
-    return unquote(parsed.path.strip("/").split("/")[-1])
+TARGET_URL = os.getenv(
+    "CRAWLER_MOEGIRL_URL",
+    "https://mzh.moegirl.org.cn/东海帝王",
+)
+KEYWORD = os.getenv("CRAWLER_MOEGIRL_QUERY", "东海帝王")
 
 
-async def _run() -> None:
-    target_url = os.getenv(
-        "CRAWLER_MOEGIRL_URL",
-        "https://mzh.moegirl.org.cn/东海帝王",
-    )
-    keyword = os.getenv("CRAWLER_MOEGIRL_QUERY", "东海帝王")
+async def _run(output_dir: Path) -> None:
     try:
-        titles = await search_moegirl_titles(keyword)
+        titles = await search_moegirl_titles(KEYWORD)
         if titles:
-            print(f"Search results for {keyword!r}: {titles}")
+            print(f"Search results for {KEYWORD!r}: {titles}")
             target_title = titles[0]
         else:
-            print(f"No search results for {keyword!r}, fallback to URL")
-            target_title = target_url
+            print(f"No search results for {KEYWORD!r}, fallback to URL")
+            target_title = TARGET_URL
         content = await fetch_moegirl_wikitext_expanded(
             target_title, max_depth=1, max_pages=5
         )
@@ -49,20 +43,37 @@ async def _run() -> None:
     assert isinstance(content, str)
     assert content.strip(), "Expected non-empty crawl content"
     page = parse_wiki_page(content, site="moegirl")
-    heading = target_title if titles else _title_from_url(target_title)
-    content = wiki_page_to_llm_markdown(heading, page, site="moegirl")
-    output_dir = Path("results") / "test"
-    output_dir.mkdir(parents=True, exist_ok=True)
+    content = wiki_page_to_llm_markdown(
+        title_from_url(target_title), page, site="moegirl"
+    )
     output_path = output_dir / output_name
     output_path.write_text(content, encoding="utf-8")
     print(f"Wrote {len(content)} chars to {output_path}")
     print("TEST_RESULT: PASSED")
 
 
+@pytest.mark.network
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("live_network")
+async def test_moegirl_crawler(results_dir: Path) -> None:
+    await _run(results_dir)
+
+
 @pytest.mark.asyncio
-async def test_moegirl_crawler() -> None:
-    await _run()
+async def test_moegirl_expanded_raises_when_child_fetch_fails(monkeypatch) -> None:
+    async def fake_fetch(title_or_url: str, **kwargs) -> str:
+        if title_or_url == "Missing":
+            raise RuntimeError("Moegirl API returned empty content.")
+        return "{{:Missing}}" if title_or_url == "Root" else "Body"
+
+    monkeypatch.setattr(moegirl, "fetch_moegirl_wikitext", fake_fetch)
+
+    # 与 biligame / umamusu.wiki 一致：嵌入页取不到内容时整体报错
+    with pytest.raises(RuntimeError, match="Missing"):
+        await moegirl.fetch_moegirl_wikitext_expanded("Root", max_depth=1, max_pages=5)
 
 
 if __name__ == "__main__":
-    asyncio.run(_run())
+    _output_dir = Path("results") / "test"
+    _output_dir.mkdir(parents=True, exist_ok=True)
+    run_async(_run(_output_dir))
@@ -0,0 +1,43 @@
+from umamusume_web_crawler.web.parse_wiki_infobox import (
+    _extract_infobox_block,
+    parse_wiki_page,
+    wiki_page_to_llm_markdown,
+    wikitext_to_llm_markdown,
+)
+
+
+def test_extract_infobox_block_matches_nested_braces() -> None:
+    wikitext = (
+        "开头文字\n"
+        "{{角色信息\n|名字={{lang|ja|トウカイテイオー}}\n|生日=4月20日\n}}\n"
+        "== 简介 ==\n正文"
+    )
+    block, start, end = _extract_infobox_block(wikitext)
+
+    assert block.startswith("{{角色信息")
+    assert block.endswith("4月20日\n}}")
+    assert wikitext[start:end] == block
+
+
+def test_extract_infobox_block_ignores_unbalanced_block() -> None:
+    assert _extract_infobox_block("{{Infobox\n|a={{b}}\n") == ("", -1, -1)
+
+
+def test_extract_infobox_block_skips_unclosed_outer_candidate() -> None:
+    wikitext = "{{Infobox 残缺\n{{角色信息\n|名字=东海帝王\n}}\n正文"
+    block, start, end = _extract_infobox_block(wikitext)
+
+    assert block == "{{角色信息\n|名字=东海帝王\n}}"
+    assert wikitext[start:end] == block
+
+
+def test_wikitext_to_llm_markdown_matches_full_parse() -> None:
+    wikitext = (
+        "{{角色信息\n|中文名=东海帝王\n|声优=[[Machico]]\n}}\n"
+        "'''东海帝王'''是赛马娘角色。\n== 角色经历 ==\n{{:东海帝王/经历}}\n正文"
+    )
+    expected = wiki_page_to_llm_markdown(
+        "东海帝王", parse_wiki_page(wikitext, site="moegirl"), site="moegirl"
+    )
+
+    assert wikitext_to_llm_markdown("东海帝王", wikitext, site="moegirl") == expected
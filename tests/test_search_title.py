@@ -1,17 +1,21 @@
+import asyncio
 import os
-import sys
 
 import pytest
 
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
-
 from umamusume_web_crawler.web.biligame import search_biligame_titles
 from umamusume_web_crawler.web.moegirl import search_moegirl_titles
 
 
-@pytest.mark.asyncio
+MOEGIRL_KEYWORD = os.getenv("CRAWLER_MOEGIRL_QUERY", "东海帝王")
+BILIGAME_KEYWORD = os.getenv("CRAWLER_BILIGAME_QUERY", "东海帝皇")
+
+
+@pytest.mark.network
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("live_network")
 async def test_search_moegirl_title() -> None:
-    keyword = os.getenv("CRAWLER_MOEGIRL_QUERY", "东海帝王")
+    keyword = MOEGIRL_KEYWORD
     try:
         titles = await search_moegirl_titles(keyword)
     except Exception as exc:
@@ -19,15 +23,17 @@ async def test_search_moegirl_title() -> None:
         pytest.skip(f"Moegirl search failed: {exc}")
     assert titles, "Expected moegirl search results"
     print(f"Moegirl search results for {keyword!r}: {titles}")
-    assert any(title == keyword for title in titles), (
-        f"Expected exact title {keyword!r} in moegirl results"
+    assert keyword in titles, (
+        f"Expected exact title {keyword!r} in moegirl results: {titles[:10]}"
     )
     print("TEST_RESULT: PASSED")
 
 
-@pytest.mark.asyncio
+@pytest.mark.network
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("live_network")
 async def test_search_biligame_title() -> None:
-    keyword = os.getenv("CRAWLER_BILIGAME_QUERY", "东海帝皇")
+    keyword = BILIGAME_KEYWORD
     try:
         titles = await search_biligame_titles(keyword)
     except Exception as exc:
@@ -35,7 +41,30 @@ async def test_search_biligame_title() -> None:
         pytest.skip(f"Biligame search failed: {exc}")
     assert titles, "Expected biligame search results"
     print(f"Biligame search results for {keyword!r}: {titles}")
-    assert any(title == keyword for title in titles), (
-        f"Expected exact title {keyword!r} in biligame results"
+    assert keyword in titles, (
+        f"Expected exact title {keyword!r} in biligame results: {titles[:10]}"
+    )
+    print("TEST_RESULT: PASSED")
+
+
+@pytest.mark.network
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("live_network")
+async def test_search_titles_concurrently() -> None:
+    # 两个站点的搜索互不依赖，并发发出
+    results = await asyncio.gather(
+        search_moegirl_titles(MOEGIRL_KEYWORD),
+        search_biligame_titles(BILIGAME_KEYWORD),
+        return_exceptions=True,
     )
+    for site, keyword, titles in zip(
+        ("moegirl", "biligame"), (MOEGIRL_KEYWORD, BILIGAME_KEYWORD), results
+    ):
+        if isinstance(titles, Exception):
+            print(f"TEST_RESULT: SKIPPED ({titles})")
+            pytest.skip(f"{site} search failed: {titles}")
+        assert titles, f"Expected {site} search results"
+        assert keyword in titles, (
+            f"Expected exact title {keyword!r} in {site} results: {titles[:10]}"
+        )
     print("TEST_RESULT: PASSED")
@@ -1,10 +1,6 @@
-import os
-import sys
 
 import pytest
 
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
-
 from umamusume_web_crawler.web import umamusu_wiki
 
 
@@ -31,7 +27,9 @@ async def test_list_umamusu_category_files_handles_continue(monkeypatch) -> None
     ]
     calls: list[str] = []
 
-    def fake_request_json(url: str, *, timeout_s: float, use_proxy: bool | None = None):
+    async def fake_request_json(
+        url: str, *, timeout_s: float, use_proxy: bool | None = None, cache: bool = True
+    ):
         calls.append(url)
         return responses[len(calls) - 1]
 
@@ -79,7 +77,7 @@ async def test_download_umamusu_category_images_uses_file_titles(tmp_path, monke
             "size": 3,
         }
 
-    def fake_request_bytes(
+    async def fake_request_bytes(
         url: str, *, timeout_s: float, use_proxy: bool | None = None
     ) -> bytes:
         return url.encode("utf-8")
@@ -115,7 +113,18 @@ async def test_fetch_umamusu_wikitext_expanded_appends_transclusions(monkeypatch
     ) -> str:
         return pages[title_or_url]
 
+    async def fake_fetch_many(
+        titles: list[str],
+        *,
+        endpoint: str = umamusu_wiki.DEFAULT_API_ENDPOINT,
+        timeout_s: float = 30.0,
+        use_proxy: bool | None = None,
+        concurrency: int | None = None,
+    ) -> dict[str, str]:
+        return {title: pages[title] for title in titles}
+
     monkeypatch.setattr(umamusu_wiki, "fetch_umamusu_wikitext", fake_fetch)
+    monkeypatch.setattr(umamusu_wiki, "fetch_umamusu_wikitexts", fake_fetch_many)
 
     content = await umamusu_wiki.fetch_umamusu_wikitext_expanded(
         "List_of_Characters",
@@ -126,3 +135,159 @@ async def test_fetch_umamusu_wikitext_expanded_appends_transclusions(monkeypatch
     assert "Intro" in content
     assert "== Template:Characters ==" in content
     assert "Expanded body" in content
+
+
+@pytest.mark.asyncio
+async def test_fetch_umamusu_wikitext_expanded_respects_max_pages(monkeypatch) -> None:
+    pages = {
+        "Root": "{{:A}}{{:B}}{{:C}}",
+        "A": "Body A",
+        "B": "Body B",
+        "C": "Body C",
+    }
+    calls: list[str] = []
+
+    async def fake_fetch(
+        title_or_url: str,
+        *,
+        endpoint: str = umamusu_wiki.DEFAULT_API_ENDPOINT,
+        timeout_s: float = 30.0,
+        use_proxy: bool | None = None,
+    ) -> str:
+        calls.append(title_or_url)
+        return pages[title_or_url]
+
+    async def fake_fetch_many(
+        titles: list[str],
+        *,
+        endpoint: str = umamusu_wiki.DEFAULT_API_ENDPOINT,
+        timeout_s: float = 30.0,
+        use_proxy: bool | None = None,
+        concurrency: int | None = None,
+    ) -> dict[str, str]:
+        calls.extend(titles)
+        return {title: pages[title] for title in titles}
+
+    monkeypatch.setattr(umamusu_wiki, "fetch_umamusu_wikitext", fake_fetch)
+    monkeypatch.setattr(umamusu_wiki, "fetch_umamusu_wikitexts", fake_fetch_many)
+
+    content = await umamusu_wiki.fetch_umamusu_wikitext_expanded(
+        "Root",
+        max_depth=1,
+        max_pages=3,
+    )
+
+    assert calls == ["Root", "A", "B"]
+    assert content.index("== A ==") < content.index("== B ==")
+    assert "Body C" not in content
+
+
+def _fake_umamusu_pages(monkeypatch, pages: dict[str, str]) -> None:
+    async def fake_fetch(title_or_url: str, **kwargs) -> str:
+        return pages[title_or_url]
+
+    async def fake_fetch_many(titles: list[str], **kwargs) -> dict[str, str]:
+        return {title: pages[title] for title in titles if pages.get(title)}
+
+    monkeypatch.setattr(umamusu_wiki, "fetch_umamusu_wikitext", fake_fetch)
+    monkeypatch.setattr(umamusu_wiki, "fetch_umamusu_wikitexts", fake_fetch_many)
+
+
+@pytest.mark.asyncio
+async def test_fetch_umamusu_wikitext_expanded_keeps_shallow_pages_first(
+    monkeypatch,
+) -> None:
+    _fake_umamusu_pages(
+        monkeypatch,
+        {"Root": "{{:A}}{{:B}}", "A": "Body A {{:A1}}", "B": "Body B", "A1": "Body A1"},
+    )
+
+    content = await umamusu_wiki.fetch_umamusu_wikitext_expanded(
+        "Root", max_depth=2, max_pages=3
+    )
+
+    # 广度优先：max_pages 先留给浅层的 A、B，深层的 A1 被截断
+    assert "Body B" in content
+    assert "Body A1" not in content
+
+
+@pytest.mark.asyncio
+async def test_fetch_umamusu_wikitext_expanded_raises_on_empty_child(
+    monkeypatch,
+) -> None:
+    _fake_umamusu_pages(
+        monkeypatch, {"Root": "{{:A}}{{:Empty}}", "A": "Body A", "Empty": ""}
+    )
+
+    with pytest.raises(RuntimeError, match="Empty"):
+        await umamusu_wiki.fetch_umamusu_wikitext_expanded(
+            "Root", max_depth=1, max_pages=5
+        )
+
+
+@pytest.mark.asyncio
+async def test_fetch_umamusu_wikitexts_batches_titles(monkeypatch) -> None:
+    calls: list[str] = []
+
+    async def fake_request_json(
+        url: str, *, timeout_s: float, use_proxy: bool | None = None, cache: bool = True
+    ):
+        calls.append(url)
+        return {
+            "query": {
+                "normalized": [{"from": "Template:Foo_Bar", "to": "Template:Foo Bar"}],
+                "pages": [
+                    {
+                        "title": "Template:Foo Bar",
+                        "revisions": [{"slots": {"main": {"content": "Foo"}}}],
+                    },
+                    {"title": "Missing", "missing": True},
+                ],
+            }
+        }
+
+    monkeypatch.setattr(umamusu_wiki, "_request_json", fake_request_json)
+
+    contents = await umamusu_wiki.fetch_umamusu_wikitexts(
+        ["Template:Foo_Bar", "Missing", "Template:Foo_Bar"]
+    )
+
+    assert contents == {"Template:Foo_Bar": "Foo"}
+    assert len(calls) == 1
+    assert "titles=Template%3AFoo_Bar%7CMissing" in calls[0]
+
+
+@pytest.mark.asyncio
+async def test_fetch_umamusu_wikitexts_follows_continue(monkeypatch) -> None:
+    calls: list[str] = []
+
+    async def fake_request_json(
+        url: str, *, timeout_s: float, use_proxy: bool | None = None, cache: bool = True
+    ):
+        calls.append(url)
+        if "rvcontinue" not in url:
+            return {
+                "continue": {"rvcontinue": "20|200", "continue": "||"},
+                "query": {
+                    "pages": [
+                        {"title": "A", "revisions": [{"slots": {"main": {"content": "A"}}}]},
+                        {"title": "B"},
+                    ]
+                },
+            }
+        return {
+            "query": {
+                "pages": [
+                    {"title": "A"},
+                    {"title": "B", "revisions": [{"slots": {"main": {"content": "B"}}}]},
+                ]
+            }
+        }
+
+    monkeypatch.setattr(umamusu_wiki, "_request_json", fake_request_json)
+
+    contents = await umamusu_wiki.fetch_umamusu_wikitexts(["A", "B"])
+
+    assert contents == {"A": "A", "B": "B"}
+    assert len(calls) == 2
+    assert "rvcontinue=20%7C200" in calls[1]
@@ -0,0 +1,39 @@
+from umamusume_web_crawler.url_utils import (
+    build_wiki_url,
+    clear_url_caches,
+    detect_mode,
+    title_from_url,
+)
+
+
+def test_detect_mode_matches_site_hosts() -> None:
+    assert detect_mode("https://wiki.biligame.com/umamusume/东海帝皇") == "biligame"
+    assert detect_mode("https://mzh.moegirl.org.cn/东海帝王") == "moegirl"
+    assert detect_mode("https://umamusu.wiki/List_of_Characters") == "umamusu"
+    assert detect_mode("https://wiki.biligame.com.example.org/page") == "generic"
+
+
+def test_title_from_url_handles_paths_and_index_php() -> None:
+    assert title_from_url("东海帝皇") == "东海帝皇"
+    assert (
+        title_from_url("https://wiki.biligame.com/umamusume/%E4%B8%9C%E6%B5%B7")
+        == "东海"
+    )
+    assert (
+        title_from_url("https://mzh.moegirl.org.cn/index.php?title=東海&action=edit")
+        == "東海"
+    )
+
+
+def test_title_from_url_returns_empty_for_bare_host() -> None:
+    # 调用方（如 CLI 的标题）需要自行回退到默认值
+    assert title_from_url("https://wiki.biligame.com/") == ""
+    assert title_from_url("https://umamusu.wiki") == ""
+
+
+def test_build_wiki_url_quotes_title_and_is_cached() -> None:
+    clear_url_caches()
+    base = "https://wiki.biligame.com/umamusume/"
+    assert build_wiki_url(base, "东海帝皇") == f"{base}%E4%B8%9C%E6%B5%B7%E5%B8%9D%E7%9A%87"
+    build_wiki_url(base, "东海帝皇")
+    assert build_wiki_url.cache_info().hits == 1
@@ -1,70 +1,74 @@
 import asyncio
-import json
 import os
-import sys
 from pathlib import Path
 from urllib.parse import urlparse
 
 import pytest
 
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from umamusume_web_crawler.config import config
+from umamusume_web_crawler.runner import run_async
 from umamusume_web_crawler.web.crawler import (
     crawl_biligame_page_visual,
     crawl_moegirl_page_visual,
 )
+from umamusume_web_crawler.web.http_client import json_dumps
 
 
-async def _run_capture() -> dict:
-    target_url = os.getenv(
-        "CRAWLER_BILIGAME_URL",
-        "https://wiki.biligame.com/umamusume/东海帝皇",
-        # "https://mzh.moegirl.org.cn/东海帝王",
-    )
-    use_proxy = os.getenv("CRAWLER_USE_PROXY", "0") not in ("0", "false", "False")
-    capture_pdf = os.getenv("CRAWLER_CAPTURE_PDF", "1") not in ("0", "false", "False")
-    pdf_from_png = os.getenv("CRAWLER_PDF_FROM_PNG", "0") not in ("0", "false", "False")
-    print_scale = os.getenv("CRAWLER_PRINT_SCALE")
-    print_scale_value = float(print_scale) if print_scale else None
-    if use_proxy and not config.proxy_url():
-        print("Warning: CRAWLER_USE_PROXY=1 but HTTP_PROXY/HTTPS_PROXY is not set.")
+_FALSY = frozenset(("0", "false", "False"))
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    return os.getenv(name, "1" if default else "0") not in _FALSY
+
 
-    output_dir = Path(os.getenv("CRAWLER_VISUAL_DIR", "results/test/visual"))
-    output_dir.mkdir(parents=True, exist_ok=True)
+# 环境变量在导入时读取一次（load_dotenv 之后）
+TARGET_URL = os.getenv(
+    "CRAWLER_BILIGAME_URL",
+    "https://wiki.biligame.com/umamusume/东海帝皇",
+    # "https://mzh.moegirl.org.cn/东海帝王",
+)
+USE_PROXY = _env_flag("CRAWLER_USE_PROXY")
+CAPTURE_PDF = _env_flag("CRAWLER_CAPTURE_PDF", default=True)
+PDF_FROM_PNG = _env_flag("CRAWLER_PDF_FROM_PNG")
+_print_scale = os.getenv("CRAWLER_PRINT_SCALE")
+PRINT_SCALE = float(_print_scale) if _print_scale else None
+
+
+async def _run_capture(output_dir: Path) -> dict:
+    if USE_PROXY and not config.proxy_url():
+        print("Warning: CRAWLER_USE_PROXY=1 but HTTP_PROXY/HTTPS_PROXY is not set.")
 
-    if "moegirl.org.cn" in urlparse(target_url).netloc:
+    if "moegirl.org.cn" in urlparse(TARGET_URL).netloc:
         capture = await crawl_moegirl_page_visual(
-            target_url,
-            use_proxy=use_proxy,
+            TARGET_URL,
+            use_proxy=USE_PROXY,
             output_dir=output_dir,
-            capture_pdf=capture_pdf,
-            pdf_from_png=pdf_from_png,
-            print_scale=print_scale_value,
+            capture_pdf=CAPTURE_PDF,
+            pdf_from_png=PDF_FROM_PNG,
+            print_scale=PRINT_SCALE,
         )
     else:
         capture = await crawl_biligame_page_visual(
-            target_url,
-            use_proxy=use_proxy,
+            TARGET_URL,
+            use_proxy=USE_PROXY,
             output_dir=output_dir,
-            capture_pdf=capture_pdf,
-            pdf_from_png=pdf_from_png,
-            print_scale=print_scale_value,
+            capture_pdf=CAPTURE_PDF,
+            pdf_from_png=PDF_FROM_PNG,
+            print_scale=PRINT_SCALE,
         )
 
     return capture
 
 
-async def _run() -> None:
-    capture = await _run_capture()
-    results_dir = Path("results") / "test"
-    results_dir.mkdir(parents=True, exist_ok=True)
+async def _run(results_dir: Path, visual_dir: Path) -> None:
+    capture = await _run_capture(visual_dir)
     output_path = results_dir / "visual_capture.json"
-    output_path.write_text(json.dumps(capture, ensure_ascii=False, indent=2), encoding="utf-8")
+    output_path.write_text(json_dumps(capture), encoding="utf-8")
 
     pdf_path = capture.get("pdf_path")
     png_path = capture.get("png_path")
@@ -78,10 +82,12 @@ async def _run() -> None:
         print(f"PNG saved at {png_path} ({size} bytes)")
 
 
-@pytest.mark.asyncio
-async def test_visual_capture_pdf() -> None:
+@pytest.mark.network
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.usefixtures("live_network")
+async def test_visual_capture_pdf(visual_dir: Path) -> None:
     try:
-        capture = await _run_capture()
+        capture = await _run_capture(visual_dir)
     except asyncio.TimeoutError:
         print("TEST_RESULT: FAILED (timeout)")
         raise
@@ -94,4 +100,8 @@ async def test_visual_capture_pdf() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(_run())
+    _results_dir = Path("results") / "test"
+    _visual_dir = Path(os.getenv("CRAWLER_VISUAL_DIR", "results/test/visual"))
+    for _path in (_results_dir, _visual_dir):
+        _path.mkdir(parents=True, exist_ok=True)
+    run_async(_run(_results_dir, _visual_dir))